@@ -60,12 +60,15 @@ def cmd_scatter(args):
     """Generate scatter plot of duration vs rows."""
     try:
         visualizer = MetricsVisualizer(args.metrics_dir)
-        plot_path = visualizer.create_duration_vs_rows_scatter(save_plot=not args.show)
+        plot = visualizer.create_duration_vs_rows_scatter(save_plot=not args.show)
         
-        if plot_path:
-            print(f"📈 Scatter plot saved: {plot_path}")
-        else:
+        if args.show:
+            import matplotlib.pyplot as plt
+            plt.show()
+            plt.close(plot)
             print("📈 Scatter plot displayed")
+        else:
+            print(f"📈 Scatter plot saved: {plot}")
             
     except Exception as e:
         print(f"❌ Failed to create scatter plot: {e}")
@@ -74,12 +77,15 @@ def cmd_trends(args):
     """Generate performance trends chart."""
     try:
         visualizer = MetricsVisualizer(args.metrics_dir)
-        plot_path = visualizer.create_performance_trends(save_plot=not args.show)
+        plot = visualizer.create_performance_trends(save_plot=not args.show)
         
-        if plot_path:
-            print(f"📈 Trends chart saved: {plot_path}")
-        else:
+        if args.show:
+            import matplotlib.pyplot as plt
+            plt.show()
+            plt.close(plot)
             print("📈 Trends chart displayed")
+        else:
+            print(f"📈 Trends chart saved: {plot}")
             
     except Exception as e:
         print(f"❌ Failed to create trends chart: {e}")
@@ -1,120 +1,235 @@
+import json
 import logging
 import os
 import random
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
+from urllib.parse import urlparse
 
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+# Pola untuk baris pertama respons yang valid. Teks kontainer diambil sekali lewat
+# inner_text lalu dipindai di Python, sehingga respons panjang tidak diserialisasi dua kali.
+_VALID_LINE_RE = re.compile(r'^(POSITIF|NEGATIF|NETRAL|TIDAK RELEVAN)\s*-\s*.+', re.IGNORECASE)
+_LABEL_TOKEN_RE = re.compile(r'(POSITIF|NEGATIF|NETRAL|TIDAK RELEVAN)\s*-', re.IGNORECASE)
+
+# Baca kontainer respons dengan textContent (tanpa layout/reflow) sebelum innerText.
+# innerText tetap dipakai jika textContent tidak memberi hasil yang bisa dipercaya.
+USE_TEXT_CONTENT = True
+
+# Badan fungsi yang mengisi textarea `el` dengan `value`. Setter native HTMLTextAreaElement
+# dipakai (bukan el.value = ...) agar binding Angular Aistudio membaca nilai baru, lalu event
+# input/change dipicu. Dipakai bersama oleh _FAST_FILL_JS dan _SUBMIT_PROMPT_JS.
+_FILL_TEXTAREA_JS = """
+    const setter = Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, 'value').set;
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+"""
+
+# Mengisi textarea sekaligus lewat locator.evaluate.
+_FAST_FILL_JS = "(el, value) => {" + _FILL_TEXTAREA_JS + "}"
+
+_INPUT_SELECTOR = 'ms-chunk-input textarea'
+_SEND_BUTTON_SELECTOR = 'footer button[aria-label="Run"]'
+
+# Rentang jeda acak (detik) sebelum aksi yang terlihat oleh pengguna.
+_HUMAN_PAUSE_RANGE = (0.05, 0.2)
+
+# Mengisi prompt dan mengklik Run dalam satu round-trip. Jeda clickDelayMs di antara pengisian
+# dan klik memberi tombol Run waktu untuk aktif sekaligus meniru jeda manusia sebelum mengklik.
+# Mengembalikan 'clicked', 'filled' (tombol belum aktif/tidak ada), atau 'missing' (textarea tidak ada).
+_SUBMIT_PROMPT_JS = """
+async ([inputSelector, value, buttonSelector, clickDelayMs]) => {
+    const el = document.querySelector(inputSelector);
+    if (!el) return 'missing';""" + _FILL_TEXTAREA_JS + """    await new Promise((resolve) => setTimeout(resolve, clickDelayMs));
+    const button = document.querySelector(buttonSelector);
+    if (!button || button.disabled) return 'filled';
+    button.click();
+    return 'clicked';
+}
+"""
+
+# Terpenuhi saat ada kontainer respons baru (indeks >= jumlah sebelum prompt dikirim)
+# yang sudah berisi teks. Respons dari giliran sebelumnya diabaikan.
+_RESPONSE_NOT_EMPTY_JS = """
+([selectors, counts]) => selectors.some((selector, i) => {
+    const elements = document.querySelectorAll(selector);
+    for (let j = counts[i]; j < elements.length; j++) {
+        if (elements[j].textContent.trim().length > 0) return true;
+    }
+    return false;
+})
+"""
+
+# Elemen respons (kontainer yang paling mungkin lebih dulu) yang dihitung sebelum prompt dikirim;
+# respons batch ini adalah elemen dengan indeks >= jumlah tersebut, sehingga respons giliran
+# sebelumnya (termasuk prompt yang ditampilkan ulang) tidak ikut terdeteksi.
+_RESPONSE_ELEMENT_SELECTORS = ('ms-message-content', 'div.model-response-text')
+
+_COUNT_RESPONSES_JS = """
+(selectors) => selectors.map((selector) => document.querySelectorAll(selector).length)
+"""
+
+# Membaca semua kontainer respons dalam satu round-trip. Per selector, hanya elemen terakhir
+# yang ditambahkan setelah jumlah sebelum prompt dikirim (counts) yang dibaca. Mengembalikan
+# daftar {selector, index, text} untuk kontainer yang berisi teks, sesuai urutan selector.
+_RESPONSE_TEXTS_JS = """
+([selectors, counts, useTextContent]) => {
+    const found = [];
+    selectors.forEach((selector, i) => {
+        const elements = document.querySelectorAll(selector);
+        const index = elements.length - 1;
+        if (index < counts[i]) return;
+        const element = elements[index];
+        const text = useTextContent ? element.textContent : element.innerText;
+        if (text && text.trim()) found.push({ selector, index, text });
+    });
+    return found;
+}
+"""
+
+# Akar fallback ekstraksi: giliran chat terakhir, atau seluruh body jika tidak ditemukan.
+_FALLBACK_ROOT_SELECTORS = ('ms-chat-turn:last-of-type', 'body')
+_FALLBACK_TEXT_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        const element = document.querySelector(selector);
+        if (element) return element.innerText;
+    }
+    return null;
+}
+"""
+
+# Terpenuhi saat panjang teks akar fallback sama pada dua polling berturut-turut (DOM stabil).
+# Token per pemanggilan mencegah panjang dari batch sebelumnya dianggap sebagai polling pertama.
+_TEXT_STABLE_JS = """
+([selectors, token]) => {
+    let element = null;
+    for (const selector of selectors) {
+        element = document.querySelector(selector);
+        if (element) break;
+    }
+    const length = element ? element.textContent.length : -1;
+    const previous = window.__labelingStableCheck;
+    window.__labelingStableCheck = { token, length };
+    return length > 0 && previous !== undefined && previous.token === token && previous.length === length;
+}
+"""
+_TEXT_STABLE_TIMEOUT_MS = 3000
+_TEXT_STABLE_POLLING_MS = 100
+
+# Penyamaran anti-deteksi. Dipasang sebagai init script agar berjalan sebelum skrip
+# halaman membaca navigator.webdriver dan properti sejenisnya.
+_STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', { get: () => false });
+window.chrome = { runtime: {} };
+Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
+Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+"""
+
+# Strategi peluncuran browser, dicoba berurutan. Konteks persisten (profil yang sudah login)
+# selalu dicoba pertama; fallback yang terakhir berhasil disimpan di user_data_dir dan hanya
+# dipakai untuk mengurutkan fallback, sehingga kegagalan sesaat tidak mengunci profil selamanya.
+_LAUNCH_STRATEGIES = ("persistent", "regular", "headless")
+_LAUNCH_STRATEGY_CACHE_FILE = "_launch_strategy_cache.json"
+
+_BROWSER_ARGS = [
+    '--no-sandbox',
+    '--start-maximized',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-site-isolation-trials'
+]
+# Jenis resource yang tidak dibutuhkan untuk otomatisasi dan boleh diblokir (lihat block_resources)
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+_VIEWPORT = {"width": 1280, "height": 800}
+
 class Automation:
     """
     Menangani tugas otomatisasi browser untuk berinteraksi dengan Aistudio menggunakan Playwright.
     Menggunakan konteks browser persisten untuk mempertahankan sesi login.
     """
-    def __init__(self, user_data_dir: str, log_folder: Path):
+    def __init__(self, user_data_dir: str, log_folder: Path, slow_mo: float = 0, prewarm_url: str | None = None,
+                 block_resources: bool = False, max_retries: int = 3, retry_base_delay: float = 1.0,
+                 retry_max_delay: float = 30.0, retry_jitter: float = 0.5,
+                 remote_debugging_port: int | None = None):
         """
         Menginisialisasi otomatisasi browser dengan mekanisme fallback.
 
         Args:
             user_data_dir (str): Path ke direktori untuk menyimpan data sesi browser.
             log_folder (Path): Path ke folder log sesi untuk menyimpan screenshot & file debug.
+            slow_mo (float): Jeda (ms) sebelum setiap aksi Playwright. Default 0 karena setiap
+                aksi sudah dijaga oleh penungguan berbasis event; naikkan hanya untuk debugging.
+            prewarm_url (str | None): Jika diisi, navigasi ke URL ini dimulai di akhir inisialisasi
+                tanpa menunggu halaman selesai dimuat, sehingga start_session tidak perlu
+                menanggung seluruh waktu muat SPA.
+            block_resources (bool): Jika True, request gambar, font, dan media dibatalkan agar
+                halaman lebih cepat siap. Nonaktif secara default karena routing membuat
+                cache HTTP browser tidak terpakai dan halaman login Google membutuhkan gambar.
+            max_retries (int): Jumlah percobaan per batch di get_raw_response_for_batch.
+            retry_base_delay (float): Jeda dasar (detik) backoff eksponensial antar percobaan.
+            retry_max_delay (float): Batas atas jeda backoff (detik) sebelum jitter.
+            retry_jitter (float): Fraksi jitter acak (0.5 berarti jeda dikali 0.5–1.5).
+            remote_debugging_port (int | None): Jika diisi, browser membuka endpoint CDP di port ini
+                agar proses lain dapat memakai browser yang sama lewat from_cdp().
         """
-        self.log_folder = log_folder
+        self._init_settings(log_folder, max_retries, retry_base_delay, retry_max_delay, retry_jitter)
+        self._extra_browser_args = []
+        if remote_debugging_port:
+            self._extra_browser_args.append(f"--remote-debugging-port={remote_debugging_port}")
         self.playwright = sync_playwright().start()
         self.context = None
         self.browser = None
         self.page = None
         
-        user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
-        
         os.makedirs(user_data_dir, exist_ok=True)
+        self._strategy_cache_path = Path(user_data_dir) / _LAUNCH_STRATEGY_CACHE_FILE
         
-        # Coba beberapa strategi untuk meluncurkan browser
-        success = False
+        launchers = {
+            "persistent": lambda: self._launch_persistent_context(user_data_dir, slow_mo),
+            "regular": lambda: self._launch_regular_browser(slow_mo),
+            "headless": self._launch_headless_browser,
+        }
         
-        # STRATEGI 1: Launch persistent context (preferred)
-        try:
-            logging.info("Meluncurkan browser Chromium dengan konteks persisten...")
-            self.context = self.playwright.chromium.launch_persistent_context(
-                user_data_dir,
-                headless=False,
-                channel="chrome",
-                slow_mo=150,
-                user_agent=user_agent,
-                viewport={"width": 1280, "height": 800},
-                args=[
-                    '--no-sandbox',
-                    '--start-maximized',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-features=IsolateOrigins,site-per-process',
-                    '--disable-site-isolation-trials'
-                ]
-            )
-            
-            if self.context.pages:
-                self.page = self.context.pages[0]
-            else:
-                self.page = self.context.new_page()
-            
-            success = True
-            logging.info("✅ Berhasil meluncurkan browser dengan persistent context.")
-            
-        except Exception as e:
-            logging.warning(f"❌ Gagal meluncurkan persistent context: {e}")
-            
-            # STRATEGI 2: Launch regular browser tanpa persistent context
+        # Konteks persisten selalu dicoba lebih dulu; fallback yang terakhir berhasil
+        # dicoba sebelum fallback lainnya
+        cached_strategy = self._read_cached_launch_strategy()
+        strategies = list(_LAUNCH_STRATEGIES)
+        if cached_strategy in strategies[1:]:
+            strategies.remove(cached_strategy)
+            strategies.insert(1, cached_strategy)
+            logging.info(f"Fallback peluncuran tersimpan: '{cached_strategy}'.")
+        
+        last_error = None
+        for strategy in strategies:
             try:
-                logging.info("Mencoba meluncurkan browser reguler...")
-                self.browser = self.playwright.chromium.launch(
-                    headless=False,
-                    channel="chrome",
-                    slow_mo=150,
-                    args=[
-                        '--no-sandbox',
-                        '--start-maximized',
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-features=IsolateOrigins,site-per-process',
-                        '--disable-site-isolation-trials'
-                    ]
-                )
-                
-                self.context = self.browser.new_context(
-                    user_agent=user_agent,
-                    viewport={"width": 1280, "height": 800}
-                )
-                
-                self.page = self.context.new_page()
-                success = True
-                logging.info("✅ Berhasil meluncurkan browser reguler.")
-                
-            except Exception as e2:
-                logging.error(f"❌ Gagal meluncurkan browser reguler: {e2}")
-                
-                # STRATEGI 3: Launch headless sebagai fallback terakhir
-                try:
-                    logging.info("Mencoba meluncurkan browser headless sebagai fallback...")
-                    self.browser = self.playwright.chromium.launch(
-                        headless=True,
-                        args=['--no-sandbox']
-                    )
-                    
-                    self.context = self.browser.new_context(
-                        user_agent=user_agent,
-                        viewport={"width": 1280, "height": 800}
-                    )
-                    
-                    self.page = self.context.new_page()
-                    success = True
-                    logging.warning("⚠️ Berhasil meluncurkan browser headless (tidak ada UI).")
-                    
-                except Exception as e3:
-                    logging.critical(f"❌ Gagal meluncurkan browser sama sekali: {e3}")
+                launchers[strategy]()
+            except Exception as e:
+                last_error = e
+                logging.warning(f"❌ Strategi peluncuran '{strategy}' gagal: {e}")
+                continue
+            
+            if self.page:
+                if strategy == _LAUNCH_STRATEGIES[0]:
+                    # Profil persisten kembali bisa dipakai; fallback lama tidak relevan lagi
+                    if cached_strategy is not None:
+                        self._clear_cached_launch_strategy()
+                elif strategy != cached_strategy:
+                    self._write_cached_launch_strategy(strategy)
+                break
         
-        if not success or not self.page:
+        if not self.page:
             logging.critical("============================================================")
             logging.critical("GAGAL TOTAL MELUNCURKAN BROWSER!")
-            logging.critical(f"Detail Error: {e}")
+            logging.critical(f"Detail Error: {last_error}")
             logging.critical("")
             logging.critical("Ini kemungkinan besar adalah masalah lingkungan, bukan kode.")
             logging.critical("SOLUSI YANG DISARANKAN:")
@@ -124,47 +239,240 @@ class Automation:
             logging.critical("   playwright install")
             logging.critical("3. Coba jalankan kembali aplikasi.")
             logging.critical("============================================================")
-            raise RuntimeError("Gagal meluncurkan browser setelah mencoba semua metode fallback.") from e
+            raise RuntimeError("Gagal meluncurkan browser setelah mencoba semua metode fallback.") from last_error
         
+        # Pasang penyamaran pada setiap dokumen yang dimuat
+        self._apply_stealth_techniques()
+        if block_resources:
+            self._block_heavy_resources()
+        self._setup_page(prewarm_url)
+
+    def _init_settings(self, log_folder: Path, max_retries: int = 3, retry_base_delay: float = 1.0,
+                       retry_max_delay: float = 30.0, retry_jitter: float = 0.5):
+        """Mengisi atribut yang tidak bergantung pada cara browser diperoleh."""
+        self.log_folder = log_folder
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_jitter = retry_jitter
+        # Path screenshot dibangun sebagai string dari direktori yang dihitung sekali
+        self._screenshot_dir = str(log_folder)
+        # _attached: terhubung lewat CDP ke browser milik proses lain; close_session() hanya
+        # menutup tab sendiri.
+        self._attached = False
+        # Screenshot diagnostik pada jalur normal hanya diambil jika DEBUG_SCREENSHOTS=1;
+        # screenshot pada jalur error selalu diambil.
+        self.debug_screenshots = os.environ.get("DEBUG_SCREENSHOTS") == "1"
+        # Penulisan file screenshot error dilakukan di thread latar; dibuat saat pertama dipakai
+        self._io_executor = None
+
+    @classmethod
+    def from_cdp(cls, endpoint_url: str, log_folder: Path, prewarm_url: str | None = None, **kwargs) -> "Automation":
+        """
+        Terhubung ke browser yang sudah berjalan (mis. daemon yang diluncurkan dengan
+        remote_debugging_port) alih-alih meluncurkan Chromium baru. Sesi login dan runtime
+        browser dipakai ulang, dan instance ini bekerja di tab barunya sendiri.
+
+        Args:
+            endpoint_url (str): Endpoint CDP, mis. "http://localhost:9222".
+            log_folder (Path): Path ke folder log sesi untuk screenshot & file debug.
+            prewarm_url (str | None): Lihat __init__.
+            **kwargs: Pengaturan retry (max_retries, retry_base_delay, retry_max_delay, retry_jitter).
+        """
+        instance = cls.__new__(cls)
+        instance._init_settings(log_folder, **kwargs)
+        instance._attached = True
+        instance.playwright = sync_playwright().start()
+        try:
+            logging.info(f"Menghubungkan ke browser yang sudah berjalan di {endpoint_url}...")
+            instance.browser = instance.playwright.chromium.connect_over_cdp(endpoint_url)
+            if instance.browser.contexts:
+                instance.context = instance.browser.contexts[0]
+            else:
+                instance.context = instance.browser.new_context(user_agent=_USER_AGENT, viewport=_VIEWPORT)
+            instance.page = instance.context.new_page()
+        except Exception as e:
+            instance.playwright.stop()
+            raise RuntimeError(f"Gagal terhubung ke browser di {endpoint_url}.") from e
+
+        logging.info("✅ Terhubung ke browser yang sudah berjalan.")
+        instance._apply_stealth_techniques()
+        instance._setup_page(prewarm_url)
+        return instance
+
+    def _setup_page(self, prewarm_url: str | None = None):
+        """Mengatur timeout, locator, dan pemuatan awal untuk self.page."""
         # Set timeout default
         try:
             self.page.set_default_timeout(60000)  # Timeout default 60 detik
         except Exception as e:
             logging.warning(f"Gagal mengatur timeout default: {e}")
+
+        # Locator bersifat lazy, jadi aman dibuat sekali dan dipakai ulang lintas navigasi
+        self._new_chat_locator = self.page.locator('a.nav-item:has-text("Chat")')
+        self._input_locator = self.page.locator(_INPUT_SELECTOR)
+        self._send_button_locator = self.page.locator(_SEND_BUTTON_SELECTOR)
+        self._stop_button_locator = self.page.locator('button:has-text("Stop")')
+
+        if prewarm_url:
+            # Sync API Playwright tidak thread-safe, jadi navigasi dimulai di thread ini dan
+            # hanya ditunggu sampai 'commit'; sisa pemuatan berjalan sementara pemanggil
+            # menyiapkan data, lalu start_session menunggu UI siap.
+            try:
+                logging.info(f"Memulai pemuatan awal {prewarm_url}...")
+                self.page.goto(prewarm_url, wait_until="commit", timeout=90000)
+            except Exception as e:
+                logging.warning(f"Pemuatan awal gagal, start_session akan menavigasi ulang: {e}")
+
+    def _launch_persistent_context(self, user_data_dir: str, slow_mo: float):
+        """STRATEGI 1: Launch persistent context (preferred)."""
+        logging.info("Meluncurkan browser Chromium dengan konteks persisten...")
+        self.context = self.playwright.chromium.launch_persistent_context(
+            user_data_dir,
+            headless=False,
+            channel="chrome",
+            slow_mo=slow_mo,
+            user_agent=_USER_AGENT,
+            viewport=_VIEWPORT,
+            args=_BROWSER_ARGS + self._extra_browser_args
+        )
         
+        if self.context.pages:
+            self.page = self.context.pages[0]
+        else:
+            self.page = self.context.new_page()
+        
+        logging.info("✅ Berhasil meluncurkan browser dengan persistent context.")
+
+    def _launch_regular_browser(self, slow_mo: float):
+        """STRATEGI 2: Launch regular browser tanpa persistent context."""
+        logging.info("Mencoba meluncurkan browser reguler...")
+        self.browser = self.playwright.chromium.launch(
+            headless=False,
+            channel="chrome",
+            slow_mo=slow_mo,
+            args=_BROWSER_ARGS + self._extra_browser_args
+        )
+        self.context = self.browser.new_context(user_agent=_USER_AGENT, viewport=_VIEWPORT)
+        self.page = self.context.new_page()
+        logging.info("✅ Berhasil meluncurkan browser reguler.")
+
+    def _launch_headless_browser(self):
+        """STRATEGI 3: Launch headless sebagai fallback terakhir."""
+        logging.info("Mencoba meluncurkan browser headless sebagai fallback...")
+        self.browser = self.playwright.chromium.launch(
+            headless=True,
+            args=['--no-sandbox'] + self._extra_browser_args
+        )
+        self.context = self.browser.new_context(user_agent=_USER_AGENT, viewport=_VIEWPORT)
+        self.page = self.context.new_page()
+        logging.warning("⚠️ Berhasil meluncurkan browser headless (tidak ada UI).")
+
+    def _read_cached_launch_strategy(self) -> str | None:
+        """Membaca strategi peluncuran yang terakhir berhasil, jika ada."""
+        try:
+            with open(self._strategy_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("strategy")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.debug(f"Cache strategi peluncuran tidak dapat dibaca: {e}")
+            return None
+
+    def _write_cached_launch_strategy(self, strategy: str):
+        """Menyimpan strategi peluncuran yang berhasil untuk dipakai pada sesi berikutnya."""
+        try:
+            with open(self._strategy_cache_path, 'w', encoding='utf-8') as f:
+                json.dump({"strategy": strategy}, f)
+        except Exception as e:
+            logging.debug(f"Gagal menyimpan cache strategi peluncuran: {e}")
+
+    def _clear_cached_launch_strategy(self):
+        """Menghapus fallback tersimpan setelah konteks persisten kembali berhasil."""
+        try:
+            self._strategy_cache_path.unlink(missing_ok=True)
+        except Exception as e:
+            logging.debug(f"Gagal menghapus cache strategi peluncuran: {e}")
+
+    def _debug_screenshot(self, name: str):
+        """
+        Mengambil screenshot diagnostik jalur normal jika DEBUG_SCREENSHOTS=1.
+        Disimpan sebagai JPEG karena jauh lebih cepat di-encode dibanding PNG.
+        """
+        if not self.debug_screenshots:
+            return
+        self.page.screenshot(path=f"{self._screenshot_dir}/{name}.jpg", type="jpeg", quality=60, full_page=False)
+
+    def _error_screenshot(self, name: str):
+        """
+        Mengambil screenshot error dan menulisnya ke disk di thread latar. Tetap PNG (lossless,
+        sama seperti FATAL_ERROR_*.png) karena jalur error jarang dan detail teksnya penting.
+        Pengambilan tetap di thread ini karena objek Playwright sync terikat ke thread pembuatnya;
+        hanya penulisan file yang dipindahkan.
+        """
+        try:
+            data = self.page.screenshot(type="png", full_page=False)
+        except Exception as screenshot_error:
+            logging.error(f"Gagal mengambil screenshot error: {screenshot_error}")
+            return
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshot-io")
+        self._io_executor.submit(self._write_screenshot, f"{self._screenshot_dir}/{name}.png", data)
+
+    @staticmethod
+    def _write_screenshot(path: str, data: bytes):
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+        except Exception as e:
+            logging.error(f"Gagal menyimpan screenshot error ke {path}: {e}")
 
     def _apply_stealth_techniques(self):
-        """Menerapkan teknik untuk membuat browser tampak lebih manusiawi."""
-        js_script = """
-        Object.defineProperty(navigator, 'webdriver', { get: () => false });
-        window.chrome = { runtime: {} };
-        Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
-        Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+        """
+        Menerapkan teknik untuk membuat browser tampak lebih manusiawi.
+        Dipasang sekali pada konteks sehingga berlaku sebelum skrip halaman dijalankan.
         """
         try:
-            self.page.evaluate(js_script)
+            self.context.add_init_script(script=_STEALTH_JS)
             logging.info("Berhasil menerapkan penyamaran anti-deteksi pada browser.")
         except Exception as e:
             logging.warning(f"Tidak dapat menerapkan teknik penyamaran: {e}", exc_info=True)
 
+    def _block_heavy_resources(self):
+        """Membatalkan request gambar, font, dan media pada seluruh halaman di konteks ini."""
+        def handle_route(route):
+            if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+                route.abort()
+            else:
+                route.continue_()
+
+        try:
+            self.context.route("**/*", handle_route)
+            logging.info("Pemblokiran gambar, font, dan media diaktifkan.")
+        except Exception as e:
+            logging.warning(f"Gagal mengaktifkan pemblokiran resource: {e}")
+
     def start_session(self, url: str):
         """
         Menavigasi ke URL yang ditentukan dan menunggu UI utama siap.
         """
         logging.info(f"Memastikan browser berada di URL: {url}...")
-        self._apply_stealth_techniques()
         
-        if "aistudio.google.com" not in self.page.url:
+        # Penyamaran sudah terpasang sebagai init script di __init__, jadi tidak perlu diulang di sini.
+        # page.url dibaca sekali; navigasi dilewati jika halaman sudah (atau sedang) memuat host tujuan.
+        current_url = self.page.url
+        if urlparse(url).netloc not in current_url:
             logging.info(f"Menavigasi ke {url}...")
             self.page.goto(url, wait_until="domcontentloaded", timeout=90000)
+        else:
+            logging.info(f"Browser sudah berada di {current_url}, navigasi dilewati.")
 
         logging.info("Halaman dimuat. Menunggu Aistudio siap...")
         try:
-            input_locator = self.page.locator('ms-chunk-input textarea')
-            input_locator.wait_for(state="visible", timeout=180000) # Tunggu hingga 3 menit
+            self._input_locator.wait_for(state="visible", timeout=180000) # Tunggu hingga 3 menit
             
             # Ambil screenshot tampilan awal untuk debugging
-            self.page.screenshot(path=self.log_folder / "debug_session_start.png")
+            self._debug_screenshot("debug_session_start")
             logging.info("Aistudio siap. Kotak input utama terdeteksi.")
 
         except Exception as e:
@@ -175,7 +483,7 @@ class Automation:
             logging.critical(f"Detail Error: {e}", exc_info=True)
             
             try:
-                self.page.screenshot(path=self.log_folder / "FATAL_ERROR_timeout.png")
+                self.page.screenshot(path=f"{self._screenshot_dir}/FATAL_ERROR_timeout.png")
             except Exception as screenshot_error:
                 logging.error(f"Gagal mengambil screenshot error: {screenshot_error}")
             
@@ -191,42 +499,57 @@ class Automation:
 
         Returns:
             str | None: Teks respons mentah jika berhasil, atau None jika semua percobaan gagal.
+
+        Raises:
+            Exception: Jika kotak input tetap tidak ditemukan setelah halaman dimuat ulang.
+                Kondisi UI seperti ini tidak akan pulih dengan retry, jadi tidak ditelan.
         """
-        max_retries = 3
+        max_retries = self.max_retries
         for attempt in range(max_retries):
-            try:
-                if attempt > 0:
-                    delay = 5 * attempt
-                    logging.warning(f"Percobaan ke-{attempt + 1}/{max_retries}. Menunggu {delay} detik sebelum mencoba lagi...")
-                    time.sleep(delay)
-                    logging.info("Memuat ulang halaman sebelum mencoba lagi...")
-                    self.page.reload(wait_until="domcontentloaded")
-                    self.page.wait_for_selector('ms-chunk-input textarea', timeout=60000)
+            if attempt > 0:
+                # Backoff eksponensial terpotong dengan jitter
+                delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+                delay *= 1 + random.uniform(-self.retry_jitter, self.retry_jitter)
+                logging.warning(f"Percobaan ke-{attempt + 1}/{max_retries}. Menunggu {delay:.1f} detik sebelum mencoba lagi...")
+                self.page.wait_for_timeout(delay * 1000)
+                # Mulai obrolan baru agar runtime SPA tetap hangat; clear_chat_history
+                # sendiri akan memuat ulang halaman jika cara ini gagal.
+                self.clear_chat_history()
 
+            try:
                 logging.info(f"Memproses batch, percobaan #{attempt + 1}...")
                 
-                input_textbox_selector = 'ms-chunk-input textarea'
-                send_button_selector = 'footer button[aria-label="Run"]'
-                
-                # Mengisi prompt
-                self.page.fill(input_textbox_selector, full_prompt)
-                
-                # Mengklik tombol kirim
-                self.page.click(send_button_selector)
+                # Catat jumlah respons yang sudah ada agar hanya respons baru yang ditunggu
+                response_counts = self._count_response_elements()
+
+                # Mengisi prompt dan mengklik tombol kirim
+                self._human_pause()
+                self._submit_prompt(full_prompt)
                 logging.info("Prompt dikirim. Menunggu respons dari model...")
 
-                self.page.screenshot(path=self.log_folder / f"debug_before_response_gen_attempt_{attempt+1}.png")
+                self._debug_screenshot(f"debug_before_response_gen_attempt_{attempt+1}")
 
                 # Logika penungguan dinamis
-                if not self._wait_for_generation_to_complete():
+                if not self._wait_for_generation_to_complete(response_counts):
                     logging.error("Model tidak menyelesaikan generasi dalam waktu yang ditentukan.")
                     continue # Lanjut ke percobaan berikutnya
 
-                self.page.screenshot(path=self.log_folder / f"debug_after_response_gen_attempt_{attempt+1}.png")
-                time.sleep(2) # Beri waktu ekstra untuk UI render
+                self._debug_screenshot(f"debug_after_response_gen_attempt_{attempt+1}")
+                # Tunggu kontainer respons batch ini ter-render alih-alih jeda tetap; lanjut segera
+                # jika sudah ada. ':last-of-type' tidak dipakai karena cocok dengan lebih dari satu
+                # elemen (satu per parent) sehingga strict mode Playwright langsung gagal.
+                response_locator = self.page.locator(_RESPONSE_ELEMENT_SELECTORS[0])
+                if response_counts is not None:
+                    response_locator = response_locator.nth(response_counts[0])
+                else:
+                    response_locator = response_locator.last
+                try:
+                    response_locator.wait_for(state="attached", timeout=5000)
+                except PlaywrightTimeoutError:
+                    logging.debug("Kontainer respons belum terdeteksi, melanjutkan ke ekstraksi.")
 
                 # Logika ekstraksi respons berlapis
-                raw_response = self._extract_response_text()
+                raw_response = self._extract_response_text(response_counts)
 
                 if raw_response and "internal error" not in raw_response.lower():
                     logging.info(f"Berhasil mengekstrak respons dari model (panjang: {len(raw_response)} karakter).")
@@ -240,126 +563,216 @@ class Automation:
 
             except Exception as e:
                 logging.error(f"Terjadi error saat memproses batch pada percobaan #{attempt + 1}: {e}", exc_info=True)
-                try:
-                    self.page.screenshot(path=self.log_folder / f"ERROR_process_batch_attempt_{attempt+1}.png")
-                except Exception as screenshot_error:
-                    logging.error(f"Gagal mengambil screenshot error: {screenshot_error}")
+                self._error_screenshot(f"ERROR_process_batch_attempt_{attempt+1}")
         
         logging.error(f"Gagal memproses batch setelah {max_retries} percobaan.")
         return None
 
-    def _wait_for_generation_to_complete(self) -> bool:
+    @staticmethod
+    def _human_pause():
+        """
+        Jeda acak singkat sebelum aksi yang terlihat oleh pengguna (isi prompt, klik kirim).
+        Menggantikan slow_mo global yang memperlambat setiap aksi Playwright.
+        """
+        time.sleep(random.uniform(*_HUMAN_PAUSE_RANGE))
+
+    def _fast_fill(self, text: str):
+        """
+        Mengisi kotak input dengan satu kali evaluate, melewati pemeriksaan actionability
+        dan fokus yang dilakukan fill(). Kembali ke fill() jika cara ini gagal.
+        """
+        try:
+            self._input_locator.evaluate(_FAST_FILL_JS, text)
+        except Exception as e:
+            logging.debug(f"Pengisian cepat gagal, menggunakan fill() biasa: {e}")
+            self._input_locator.fill(text)
+
+    def _submit_prompt(self, text: str):
+        """
+        Mengisi prompt dan mengklik Run dengan satu page.evaluate, dengan jeda acak di antara
+        pengisian dan klik. Jika tombol Run belum aktif, klik dilakukan lewat locator (yang
+        menunggu tombol aktif); jika textarea belum ada, kembali ke pengisian lewat locator lalu klik.
+        """
+        click_delay_ms = int(random.uniform(*_HUMAN_PAUSE_RANGE) * 1000)
+        try:
+            outcome = self.page.evaluate(
+                _SUBMIT_PROMPT_JS, [_INPUT_SELECTOR, text, _SEND_BUTTON_SELECTOR, click_delay_ms]
+            )
+        except Exception as e:
+            logging.debug(f"Pengiriman prompt via evaluate gagal: {e}")
+            outcome = 'missing'
+
+        if outcome == 'clicked':
+            return
+        if outcome != 'filled':
+            self._fast_fill(text)
+            self._human_pause()
+        self._send_button_locator.click()
+
+    def _count_response_elements(self) -> List[int] | None:
+        """
+        Menghitung elemen respons per selector di _RESPONSE_ELEMENT_SELECTORS dalam satu
+        round-trip. Mengembalikan None jika penghitungan gagal.
+        """
+        try:
+            counts = self.page.evaluate(_COUNT_RESPONSES_JS, list(_RESPONSE_ELEMENT_SELECTORS))
+        except Exception as e:
+            logging.debug(f"Gagal menghitung kontainer respons: {e}")
+            return None
+        if isinstance(counts, list) and len(counts) == len(_RESPONSE_ELEMENT_SELECTORS):
+            return counts
+        return None
+
+    def _new_response_locator(self, response_counts: List[int]):
+        """Locator untuk elemen respons pertama yang muncul setelah jumlah yang dicatat."""
+        locator = None
+        for selector, count in zip(_RESPONSE_ELEMENT_SELECTORS, response_counts):
+            candidate = self.page.locator(selector).nth(count)
+            locator = candidate if locator is None else locator.or_(candidate)
+        return locator
+
+    def _wait_for_generation_to_complete(self, response_counts: List[int] | None = None) -> bool:
         """
         Logika penungguan dinamis untuk mendeteksi kapan respons AI selesai dibuat.
+
+        Args:
+            response_counts (List[int] | None): Hasil _count_response_elements() sebelum prompt
+                dikirim. Hanya elemen respons setelah jumlah ini yang dianggap respons baru.
+                None berarti tidak ada pembanding (setiap elemen respons dihitung).
         """
         logging.info("Memulai logika penungguan dinamis...")
         max_wait_time = 240  # Maksimal 4 menit
         start_wait_time = time.time()
+        stop_button = self._stop_button_locator
+        if response_counts is None:
+            response_counts = [0] * len(_RESPONSE_ELEMENT_SELECTORS)
         
-        # Tunggu hingga tombol 'Stop' muncul (menandakan generasi dimulai)
+        # Tunggu hingga tombol 'Stop' muncul (menandakan generasi dimulai) atau kontainer
+        # respons baru ter-render, mana yang lebih dulu. Respons singkat bisa selesai
+        # sebelum tombol 'Stop' sempat terdeteksi. Kontainer dari giliran sebelumnya
+        # tidak memenuhi penungguan ini.
         try:
-            self.page.locator('button:has-text("Stop")').wait_for(state="visible", timeout=30000)
-            logging.info("Generasi dimulai (tombol 'Stop' terdeteksi).")
+            stop_button.or_(self._new_response_locator(response_counts)).first.wait_for(state="visible", timeout=30000)
+            if stop_button.is_visible():
+                logging.info("Generasi dimulai (tombol 'Stop' terdeteksi).")
+            else:
+                logging.info("Kontainer respons terdeteksi tanpa tombol 'Stop', generasi selesai dengan cepat.")
         except Exception:
-            logging.warning("Tidak mendeteksi tombol 'Stop', mungkin generasi gagal dimulai atau sudah selesai.")
-            # Tetap lanjutkan, mungkin respons muncul sangat cepat.
-
-        while True:
-            elapsed = time.time() - start_wait_time
-            if elapsed > max_wait_time:
-                logging.error(f"Waktu tunggu maksimum ({max_wait_time} detik) terlampaui.")
+            logging.warning("Tidak mendeteksi tombol 'Stop', menunggu teks respons muncul di kontainer...")
+            # Generasi mungkin lambat dimulai; tunggu hingga kontainer respons baru berisi teks
+            remaining_ms = max(0.0, max_wait_time - (time.time() - start_wait_time)) * 1000
+            try:
+                self.page.wait_for_function(
+                    _RESPONSE_NOT_EMPTY_JS,
+                    arg=[list(_RESPONSE_ELEMENT_SELECTORS), list(response_counts)],
+                    timeout=remaining_ms,
+                )
+            except PlaywrightTimeoutError:
+                logging.error(f"Tidak ada respons yang muncul dalam {max_wait_time} detik.")
+                return False
+            except Exception as e:
+                logging.error(f"Error saat menunggu teks respons: {e}")
                 return False
 
-            # Indikator utama: Tombol 'Stop' menghilang
-            try:
-                if self.page.locator('button:has-text("Stop")').count() == 0:
-                    logging.info(f"Generasi selesai (tombol 'Stop' menghilang) setelah {elapsed:.1f} detik.")
-                    return True
-            except Exception:
-                # Jika ada error saat mengecek locator, anggap saja masih ada
-                pass
-            
-            # Beri jeda singkat antar pengecekan
-            time.sleep(2)
+        # Indikator utama: Tombol 'Stop' menghilang. 'hidden' juga terpenuhi jika tombol hanya
+        # disembunyikan tanpa dilepas dari DOM. Penungguan dilakukan oleh Playwright di sisi
+        # browser sehingga tidak perlu polling manual dari Python.
+        remaining_ms = max(0.0, max_wait_time - (time.time() - start_wait_time)) * 1000
+        try:
+            stop_button.wait_for(state="hidden", timeout=remaining_ms)
+        except PlaywrightTimeoutError:
+            logging.error(f"Waktu tunggu maksimum ({max_wait_time} detik) terlampaui.")
+            return False
+        except Exception as e:
+            logging.error(f"Error saat menunggu tombol 'Stop' menghilang: {e}")
+            return False
+
+        elapsed = time.time() - start_wait_time
+        logging.info(f"Generasi selesai (tombol 'Stop' menghilang) setelah {elapsed:.1f} detik.")
+        return True
+
+    @staticmethod
+    def _slice_from_first_valid_line(text: str | None) -> str | None:
+        """Mengembalikan teks mulai dari baris valid pertama hingga akhir, atau None."""
+        if not text:
+            return None
+        lines = text.splitlines()
+        for index, line in enumerate(lines):
+            if _VALID_LINE_RE.match(line.strip()):
+                return '\n'.join(lines[index:])
+        return None
 
-    def _extract_response_text(self) -> str | None:
+    def _read_container_text(self, selector: str, index: int, text: str | None) -> str | None:
         """
-        Mengekstrak teks respons dengan menemukan baris valid pertama dan
-        mengambil semua konten dari titik itu hingga akhir.
+        Memotong teks kontainer dari baris valid pertama. Jika teks berasal dari textContent,
+        hasilnya ditolak bila tidak ada baris valid atau beberapa label tergabung dalam satu
+        baris (textContent tidak menyisipkan baris baru untuk elemen blok); kontainer itu
+        lalu dibaca ulang dengan innerText.
         """
-        logging.info("Memulai ekstraksi respons dengan metode 'Temukan Awal dan Ambil Sisanya'...")
+        sliced = self._slice_from_first_valid_line(text)
+        if not USE_TEXT_CONTENT:
+            return sliced
+        if sliced and len(_LABEL_TOKEN_RE.findall(sliced)) <= len(sliced.splitlines()):
+            return sliced
+        return self._slice_from_first_valid_line(self.page.locator(selector).nth(index).inner_text())
 
-        # JavaScript function yang akan kita inject.
-        js_extractor_function = """
-        (element) => {
-            const text = element.innerText;
-            if (!text) return null;
+    def _extract_response_text(self, response_counts: List[int] | None = None) -> str | None:
+        """
+        Mengekstrak teks respons dengan menemukan baris valid pertama dan
+        mengambil semua konten dari titik itu hingga akhir.
 
-            const lines = text.split('\\n');
-            
-            // Pola Regex untuk memeriksa baris pertama yang valid.
-            const validStartLineRegex = /^(POSITIF|NEGATIF|NETRAL|TIDAK RELEVAN)\\s*-\\s*.+/i;
-
-            // Cari indeks dari baris valid pertama
-            let startIndex = -1;
-            for (let i = 0; i < lines.length; i++) {
-                if (validStartLineRegex.test(lines[i].trim())) {
-                    startIndex = i;
-                    break; // Hentikan pencarian setelah menemukan yang pertama
-                }
-            }
-
-            // Jika baris valid ditemukan...
-            if (startIndex !== -1) {
-                // ...ambil semua baris dari indeks itu hingga akhir...
-                const relevantLines = lines.slice(startIndex);
-                // ...dan gabungkan kembali menjadi satu blok teks.
-                return relevantLines.join('\\n');
-            }
-            
-            // Jika tidak ada baris valid yang ditemukan sama sekali
-            return null;
-        }
+        Args:
+            response_counts (List[int] | None): Hasil _count_response_elements() sebelum prompt
+                dikirim. Hanya kontainer setelah jumlah ini yang dibaca, sehingga giliran
+                sebelumnya (mis. prompt dengan contoh baris label) tidak terekstrak.
         """
+        logging.info("Memulai ekstraksi respons dengan metode 'Temukan Awal dan Ambil Sisanya'...")
+        if response_counts is None:
+            response_counts = [0] * len(_RESPONSE_ELEMENT_SELECTORS)
 
-        # --- STRATEGI 1: Coba kontainer yang paling mungkin ---
-        potential_container_selectors = [
-            'ms-message-content:last-of-type',
-            'div.model-response-text:last-of-type'
-        ]
+        # --- STRATEGI 1: Baca semua kontainer yang mungkin dalam satu evaluate ---
+        try:
+            candidates = self.page.evaluate(
+                _RESPONSE_TEXTS_JS, [list(_RESPONSE_ELEMENT_SELECTORS), list(response_counts), USE_TEXT_CONTENT]
+            ) or []
+        except Exception as e:
+            logging.debug(f"Error saat membaca kontainer respons: {e}")
+            candidates = []
 
-        for selector in potential_container_selectors:
-            logging.info(f"Mencoba mengekstrak dari kontainer: '{selector}'")
+        for candidate in candidates:
+            selector = candidate.get('selector')
             try:
-                container_handle = self.page.query_selector(selector)
-                if container_handle:
-                    # Jalankan fungsi JavaScript PADA elemen kontainer yang ditemukan
-                    extracted_text = container_handle.evaluate(js_extractor_function)
-                    
-                    if extracted_text and extracted_text.strip():
-                        logging.info(f"✅ Ekstraksi berhasil dari '{selector}'.")
-                        return extracted_text
-                else:
-                    logging.debug(f"Kontainer '{selector}' tidak ditemukan.")
+                extracted_text = self._read_container_text(selector, candidate.get('index'), candidate.get('text'))
+                if extracted_text and extracted_text.strip():
+                    logging.info(f"✅ Ekstraksi berhasil dari kontainer: '{selector}'")
+                    return extracted_text
+                logging.debug(f"Kontainer '{selector}' tidak berisi baris valid.")
             except Exception as e:
-                logging.debug(f"Error saat mengekstrak dari '{selector}': {e}")
-                continue
+                logging.debug(f"Error saat mengekstrak dari kontainer '{selector}': {e}")
 
-        # --- STRATEGI 2: Fallback ke body dengan timeout tambahan ---
-        logging.warning("Strategi spesifik gagal. Menunggu 3 detik tambahan lalu mencoba ekstraksi body...")
+        # --- STRATEGI 2: Fallback ke giliran chat terakhir (atau body) dengan timeout tambahan ---
+        logging.warning("Strategi spesifik gagal. Menunggu DOM stabil (maks. 3 detik) lalu mencoba ekstraksi cadangan...")
         try:
-            # Tunggu sedikit lebih lama untuk memastikan DOM selesai render
-            time.sleep(3)
+            # Tunggu hingga teks berhenti bertambah, bukan jeda tetap, untuk memastikan DOM selesai render
+            try:
+                self.page.wait_for_function(
+                    _TEXT_STABLE_JS,
+                    arg=[list(_FALLBACK_ROOT_SELECTORS), f"{time.time()}-{random.random()}"],
+                    timeout=_TEXT_STABLE_TIMEOUT_MS,
+                    polling=_TEXT_STABLE_POLLING_MS,
+                )
+            except PlaywrightTimeoutError:
+                logging.debug("DOM belum stabil setelah batas waktu; tetap mencoba ekstraksi cadangan.")
             
-            body_handle = self.page.query_selector('body')
-            if body_handle:
-                extracted_text = body_handle.evaluate(js_extractor_function)
-                
-                if extracted_text and extracted_text.strip():
-                    logging.info("✅ Ekstraksi cadangan berhasil dari <body> setelah delay.")
-                    return extracted_text
+            # Dibatasi ke giliran chat terakhir agar innerText tidak menata ulang seluruh halaman
+            fallback_text = self.page.evaluate(_FALLBACK_TEXT_JS, list(_FALLBACK_ROOT_SELECTORS))
+            extracted_text = self._slice_from_first_valid_line(fallback_text)
+
+            if extracted_text and extracted_text.strip():
+                logging.info("✅ Ekstraksi cadangan berhasil setelah delay.")
+                return extracted_text
         except Exception as e:
-            logging.error(f"Ekstraksi cadangan dari <body> gagal: {e}", exc_info=True)
+            logging.error(f"Ekstraksi cadangan gagal: {e}", exc_info=True)
 
         logging.error("Semua metode ekstraksi gagal menemukan baris respons yang valid.")
         return None
@@ -368,17 +781,36 @@ class Automation:
         """Membersihkan riwayat obrolan dengan memulai obrolan baru."""
         try:
             logging.info("Membersihkan riwayat obrolan...")
-            self.page.locator('a.nav-item:has-text("Chat")').click()
-            self.page.locator('ms-chunk-input textarea').wait_for(state="visible", timeout=60000)
+            self._new_chat_locator.click()
+            self._input_locator.wait_for(state="visible", timeout=60000)
             time.sleep(2)
             logging.info("Riwayat obrolan dibersihkan.")
         except Exception as e:
             logging.warning(f"Tidak dapat membersihkan riwayat, memuat ulang halaman sebagai alternatif: {e}")
             self.page.reload(wait_until="domcontentloaded")
-            self.page.locator('ms-chunk-input textarea').wait_for(state="visible", timeout=60000)
+            self._input_locator.wait_for(state="visible", timeout=60000)
 
     def close_session(self):
         """Menutup sesi browser dengan aman."""
+        if self._io_executor is not None:
+            # Selesaikan penulisan screenshot yang masih antre
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
+
+        if self._attached:
+            # Browser milik proses daemon tetap hidup; cukup tutup tab milik instance ini
+            logging.info("Menutup tab pada browser bersama.")
+            try:
+                self.page.close()
+            except Exception as e:
+                logging.warning(f"Error saat menutup tab: {e}")
+            # Memutus koneksi CDP tanpa menutup konteks milik proses daemon
+            try:
+                self.playwright.stop()
+            except Exception as e:
+                logging.warning(f"Error saat memutus koneksi Playwright: {e}")
+            return
+
         logging.info("Menutup sesi browser.")
         try:
             if hasattr(self, 'context') and self.context:
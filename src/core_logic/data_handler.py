@@ -1,12 +1,67 @@
+import hashlib
+import json
 import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List
 
 import numpy as np
 import pandas as pd
 
+# Dtype string khusus pandas untuk kolom teks. Penyimpanannya mengikuti
+# pd.options.mode.string_storage (berbasis Arrow jika pyarrow terpasang).
+_TEXT_COLUMNS = ('full_text', 'label', 'justification')
+_TEXT_DTYPE = pd.StringDtype()
+
+# python-calamine (Rust) membaca .xlsx jauh lebih cepat daripada openpyxl. Opsional:
+# jika tidak terpasang, pandas kembali ke engine bawaannya.
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# xlsxwriter dengan constant_memory menulis baris langsung ke disk alih-alih menyimpan seluruh
+# workbook di memori. Opsional: jika tidak terpasang, to_excel memakai openpyxl.
+try:
+    import xlsxwriter  # noqa: F401
+    _EXCEL_WRITER_ENGINE = "xlsxwriter"
+except ImportError:
+    _EXCEL_WRITER_ENGINE = None
+
+# Parquet (pyarrow) untuk cache hasil parsing .xlsx. Opsional: tanpa pyarrow, file Excel
+# selalu di-parse ulang. Format kolumnar ini tidak mengeksekusi kode saat dibaca, berbeda dengan pickle.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Subfolder di direktori output untuk cache hasil parsing file input
+INPUT_CACHE_DIRNAME = ".input_cache"
+
+def read_excel(path) -> pd.DataFrame:
+    """Membaca file .xlsx dengan engine tercepat yang tersedia (calamine, lalu bawaan pandas)."""
+    if _EXCEL_ENGINE:
+        try:
+            return pd.read_excel(path, engine=_EXCEL_ENGINE)
+        except ValueError as e:
+            # Versi pandas lama belum mengenal engine 'calamine'
+            logging.debug(f"Engine '{_EXCEL_ENGINE}' tidak tersedia: {e}")
+    return pd.read_excel(path)
+
+def write_excel(df: pd.DataFrame, path):
+    """Menulis DataFrame ke .xlsx, secara streaming jika xlsxwriter tersedia."""
+    if _EXCEL_WRITER_ENGINE:
+        with pd.ExcelWriter(
+            path, engine=_EXCEL_WRITER_ENGINE, engine_kwargs={'options': {'constant_memory': True}}
+        ) as writer:
+            df.to_excel(writer, index=False)
+    else:
+        df.to_excel(path, index=False)
+
 class DataHandler:
     def __init__(self, input_filepath: Path, output_dir: Path = None):
         """
@@ -31,6 +86,16 @@ class DataHandler:
         # Pastikan folder output ada
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.output_filepath = self.output_dir / output_filename
+        # Checkpoint append-only berisi (index, label, justification) per batch. Namanya tidak
+        # memakai timestamp agar proses yang terhenti bisa dilanjutkan pada run berikutnya, tetapi
+        # memuat hash path absolut input agar file dengan nama sama di folder lain tidak bentrok.
+        source_digest = hashlib.sha1(str(input_filepath.resolve()).encode('utf-8')).hexdigest()[:10]
+        self.checkpoint_path = self.output_dir / f"{input_filepath.stem}.{source_digest}.checkpoint.jsonl"
+        self._parse_cache_path = self.output_dir / INPUT_CACHE_DIRNAME / f"{input_filepath.stem}.{source_digest}.parquet"
+        # Jumlah baris berlabel yang dipulihkan dari checkpoint; hasil akhir tetap perlu ditulis
+        # meskipun run ini tidak memproses baris baru.
+        self.restored_row_count = 0
+        self._checkpoint_has_header = False
         
         logging.info(f"File input: {self.input_filepath}")
         logging.info(f"File output akan disimpan di: {self.output_filepath}")
@@ -39,8 +104,16 @@ class DataHandler:
             if not self.input_filepath.is_file():
                 raise FileNotFoundError(f"File input tidak ditemukan di: {self.input_filepath}")
 
+            # Identitas file input saat dibaca; checkpoint dan cache parsing hanya dipakai jika cocok
+            stat = self.input_filepath.stat()
+            self._source_fingerprint = {
+                "source": str(self.input_filepath.resolve()),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+            }
+
             if self.input_filepath.suffix == '.xlsx':
-                self.df = pd.read_excel(self.input_filepath)
+                self.df = self._read_excel_cached()
                 logging.info(f"Berhasil membaca file Excel dengan {len(self.df)} baris.")
             elif self.input_filepath.suffix == '.csv':
                 self.df = pd.read_csv(self.input_filepath)
@@ -57,48 +130,170 @@ class DataHandler:
 
         # Memastikan kolom yang diperlukan ada
         self._ensure_columns_exist()
+        self._restore_checkpoint()
+
+        # Status "belum diproses" disimpan sebagai mask numpy dan diperbarui per batch, sehingga
+        # kolom 'label' tidak perlu dipindai ulang dengan isnull() di setiap metode.
+        # Perubahan pada df['label'] harus lewat update_and_save_data agar mask tetap sinkron.
+        self._unprocessed_mask = self.df['label'].isna().to_numpy(copy=True)
+        self._unprocessed_positions = np.flatnonzero(self._unprocessed_mask)
+        self._unprocessed_count = len(self._unprocessed_positions)
+
+    def _read_excel_cached(self) -> pd.DataFrame:
+        """
+        Membaca file Excel input. Jika pyarrow tersedia, hasil parsing disimpan sebagai Parquet di
+        folder cache milik aplikasi (output_dir/.input_cache, bukan folder dataset) dan dipakai lagi
+        selama path, mtime, dan ukuran file input masih sama dengan yang tercatat di cache.
+        """
+        if pq is None:
+            return read_excel(self.input_filepath)
+
+        cache_path = self._parse_cache_path
+        if cache_path.is_file():
+            try:
+                cached = pq.read_table(cache_path)
+                metadata = cached.schema.metadata or {}
+                if json.loads(metadata.get(b'source_fingerprint', b'null')) == self._source_fingerprint:
+                    logging.info(f"Memakai cache hasil parsing: {cache_path}")
+                    return cached.to_pandas()
+            except Exception as e:
+                logging.warning(f"Cache {cache_path} tidak bisa dibaca, membaca ulang file Excel: {e}")
+
+        df = read_excel(self.input_filepath)
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            metadata = dict(table.schema.metadata or {})
+            metadata[b'source_fingerprint'] = json.dumps(self._source_fingerprint).encode('utf-8')
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table.replace_schema_metadata(metadata), cache_path)
+        except Exception as e:
+            logging.warning(f"Gagal menulis cache {cache_path}: {e}")
+        return df
 
     def _ensure_columns_exist(self):
         """Memastikan kolom 'label' dan 'justification' ada di DataFrame."""
         made_changes = False
         if 'label' not in self.df.columns:
             logging.warning("Kolom 'label' tidak ditemukan. Membuat kolom baru.")
-            self.df['label'] = np.nan
+            self.df['label'] = pd.array([pd.NA] * len(self.df), dtype=_TEXT_DTYPE)
             made_changes = True
             
         if 'justification' not in self.df.columns:
             logging.warning("Kolom 'justification' tidak ditemukan. Membuat kolom baru.")
-            self.df['justification'] = np.nan
+            self.df['justification'] = pd.array([pd.NA] * len(self.df), dtype=_TEXT_DTYPE)
             made_changes = True
 
-            if self.df['label'].dtype != 'object':
-                self.df['label'] = self.df['label'].astype(object)
-            if self.df['justification'].dtype != 'object':
-                self.df['justification'] = self.df['justification'].astype(object)
+        # Kolom teks disimpan sebagai dtype string, bukan object berisi objek str Python,
+        # sehingga isna(), masking, dan to_numpy() bekerja pada buffer yang rapat.
+        for column in _TEXT_COLUMNS:
+            if column in self.df.columns and self.df[column].dtype != _TEXT_DTYPE:
+                self.df[column] = self.df[column].astype(_TEXT_DTYPE)
 
         if made_changes:
             logging.info("Struktur kolom telah disesuaikan - perubahan akan disimpan ke file hasil akhir")
             # Tidak lagi menyimpan perubahan struktur kembali ke file input
             # Data akan disimpan hanya ke file hasil akhir
 
-    def get_data_batches(self, batch_size: int = 50) -> List[List[str]]:
+    def _restore_checkpoint(self):
         """
-        Memecah kolom 'full_text' dari baris yang belum diproses menjadi beberapa batch.
+        Memuat label dari checkpoint run sebelumnya yang terhenti sebelum hasil akhir disimpan.
+        Baris pertama checkpoint berisi identitas file input (path, mtime, ukuran); checkpoint
+        dari file input yang sudah diubah dihapus karena indeksnya tidak lagi bisa dipercaya.
+        """
+        if not self.checkpoint_path.is_file():
+            return
+
+        restored = {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                try:
+                    header = json.loads(f.readline())
+                except json.JSONDecodeError:
+                    header = None
+                is_stale = header != self._source_fingerprint
+                for line in ([] if is_stale else f):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Baris terakhir bisa terpotong jika proses mati saat menulis
+                        logging.warning("Baris checkpoint rusak diabaikan.")
+                        continue
+                    restored[record["index"]] = (record["label"], record["justification"])
+        except Exception as e:
+            logging.error(f"Gagal membaca checkpoint {self.checkpoint_path}: {e}", exc_info=True)
+            return
+
+        if is_stale:
+            logging.warning(
+                f"Checkpoint {self.checkpoint_path} tidak cocok dengan file input saat ini "
+                f"(file berubah atau checkpoint rusak). Checkpoint diabaikan dan dihapus."
+            )
+            self.checkpoint_path.unlink(missing_ok=True)
+            return
+        self._checkpoint_has_header = True
+
+        indices = [idx for idx in restored if idx in self.df.index]
+        if not indices:
+            return
+
+        self.df.loc[indices, 'label'] = np.array([restored[idx][0] for idx in indices], dtype=object)
+        self.df.loc[indices, 'justification'] = np.array([restored[idx][1] for idx in indices], dtype=object)
+        self.restored_row_count = len(indices)
+        logging.info(f"Melanjutkan dari checkpoint: {len(indices)} baris berlabel dipulihkan dari {self.checkpoint_path}")
+
+    def _append_checkpoint(self, indices, labels, justifications):
+        """Menambahkan baris yang baru diperbarui ke checkpoint; biayanya sebanding dengan ukuran batch."""
+        try:
+            with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+                if not self._checkpoint_has_header:
+                    f.write(json.dumps(self._source_fingerprint))
+                    f.write('\n')
+                    self._checkpoint_has_header = True
+                for idx, label, justification in zip(indices, labels, justifications):
+                    f.write(json.dumps({"index": idx, "label": label, "justification": justification}, default=str))
+                    f.write('\n')
+        except Exception as e:
+            logging.error(f"Gagal menulis checkpoint: {e}", exc_info=True)
+
+    def iter_data_batches(self, batch_size: int = 50) -> Iterator[np.ndarray]:
+        """
+        Menghasilkan batch teks 'full_text' dari baris yang belum diproses satu per satu.
 
         Args:
             batch_size (int): Jumlah item per batch.
 
-        Returns:
-            List[List[str]]: Daftar batch, di mana setiap batch adalah daftar teks.
+        Yields:
+            np.ndarray: Potongan (view) array teks berukuran paling banyak batch_size.
         """
         if 'full_text' not in self.df.columns:
             logging.error("Kolom 'full_text' tidak ditemukan di dataset.")
-            return []
+            return
         
-        unprocessed_df = self.df[self.df['label'].isnull()]
-        texts = unprocessed_df['full_text'].tolist()
+        # Posisi baris yang belum diproses dibekukan di sini; start_index pada
+        # update_and_save_data merujuk ke urutan ini.
+        self._unprocessed_positions = np.flatnonzero(self._unprocessed_mask)
+        # Teks kosong (NA) dikirim sebagai string kosong, bukan teks "<NA>"
+        texts = self.df['full_text'].to_numpy(dtype=object, na_value="")[self._unprocessed_positions]
         logging.info(f"Membagi {len(texts)} baris yang belum diproses menjadi batch berukuran {batch_size}.")
-        return [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        for i in range(0, len(texts), batch_size):
+            yield texts[i:i + batch_size]
+
+    def get_data_batches(self, batch_size: int = 50) -> List[List[str]]:
+        """
+        Memecah kolom 'full_text' dari baris yang belum diproses menjadi beberapa batch.
+        Versi daftar dari iter_data_batches(), dipertahankan untuk kompatibilitas.
+
+        Args:
+            batch_size (int): Jumlah item per batch.
+
+        Returns:
+            List[List[str]]: Daftar batch, di mana setiap batch adalah daftar teks.
+        """
+        return [batch.tolist() for batch in self.iter_data_batches(batch_size)]
 
     def update_and_save_data(self, results: List[Dict[str, Any]], start_index: int):
         """
@@ -107,26 +302,34 @@ class DataHandler:
 
         Args:
             results (List[Dict[str, Any]]): Daftar dict, masing-masing berisi {"label": ..., "justification": ...}.
-            start_index (int): Indeks awal absolut dari data yang belum diproses untuk diperbarui.
+            start_index (int): Posisi awal dalam daftar baris belum diproses yang dibagi oleh
+                get_data_batches() (mis. nomor_batch * batch_size).
         """
-        # Dapatkan indeks dari semua baris yang belum diproses
-        unprocessed_indices = self.df[self.df['label'].isnull()].index
-        
-        # Tentukan slice dari indeks yang akan diperbarui
-        indices_to_update = unprocessed_indices[start_index : start_index + len(results)]
+        # Tentukan posisi baris yang akan diperbarui dari urutan yang dibekukan get_data_batches
+        positions = self._unprocessed_positions[start_index : start_index + len(results)]
+        indices_to_update = self.df.index[positions]
+        # Slicing sudah membatasi jumlah indeks; hasil berlebih diabaikan
+        results = results[:len(indices_to_update)]
 
-        for i, result_dict in enumerate(results):
-            if i < len(indices_to_update):
-                actual_index = indices_to_update[i]
-                self.df.loc[actual_index, 'label'] = result_dict["label"]
-                self.df.loc[actual_index, 'justification'] = result_dict["justification"]
+        # Satu penugasan posisional per kolom alih-alih dua penulisan .loc per baris;
+        # .iloc melewati pencocokan label indeks yang dilakukan .loc
+        labels = np.fromiter((r["label"] for r in results), dtype=object, count=len(results))
+        justifications = np.fromiter((r["justification"] for r in results), dtype=object, count=len(results))
+        self.df.iloc[positions, self.df.columns.get_loc('label')] = labels
+        self.df.iloc[positions, self.df.columns.get_loc('justification')] = justifications
+        self._append_checkpoint(indices_to_update.tolist(), labels, justifications)
 
-        logging.info(f"Data batch berhasil diperbarui dalam memori (tidak menyimpan ke file input)")
+        # Perbarui mask secara O(batch_size); baris yang sudah berlabel tidak dihitung dua kali
+        self._unprocessed_count -= int(self._unprocessed_mask[positions].sum())
+        self._unprocessed_mask[positions] = False
+
+        logging.info(f"Data batch berhasil diperbarui dalam memori dan checkpoint (tidak menyimpan ke file input)")
 
     def save_progress(self):
         """
         DEPRECATED: Fungsi ini tidak lagi digunakan untuk menghindari modifikasi file input.
-        Data progress sekarang hanya disimpan ke file hasil akhir melalui save_final_results().
+        Progress sekarang dicatat per batch ke checkpoint oleh update_and_save_data(), dan
+        file lengkap hanya ditulis oleh save_final_results().
         """
         logging.warning("save_progress() dipanggil tetapi diabaikan - data hanya akan disimpan ke file hasil akhir")
         pass
@@ -135,18 +338,17 @@ class DataHandler:
         """Menyimpan DataFrame lengkap ke file OUTPUT di folder results."""
         try:
             if self.output_filepath.suffix == '.xlsx':
-                self.df.to_excel(self.output_filepath, index=False)
+                write_excel(self.df, self.output_filepath)
             elif self.output_filepath.suffix == '.csv':
                 self.df.to_csv(self.output_filepath, index=False)
             logging.info(f"Hasil akhir yang bersih disimpan ke {self.output_filepath}")
+            # Hasil sudah lengkap di file output, checkpoint tidak diperlukan lagi
+            self.checkpoint_path.unlink(missing_ok=True)
+            self._checkpoint_has_header = False
         except Exception as e:
             logging.error(f"Gagal menyimpan hasil akhir: {e}", exc_info=True)
 
     def get_unprocessed_data_count(self) -> int:
         """Menghitung jumlah baris yang belum memiliki label."""
-        if 'label' not in self.df.columns:
-            return 0
-        
-        # Menganggap baris belum diproses jika labelnya null/NaN.
-        unprocessed_count = self.df['label'].isnull().sum()
-        return unprocessed_count
\ No newline at end of file
+        # Menganggap baris belum diproses jika labelnya null/NaN (dihitung dari mask yang di-cache).
+        return self._unprocessed_count
\ No newline at end of file
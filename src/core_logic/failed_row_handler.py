@@ -4,6 +4,11 @@ from typing import List
 
 import pandas as pd
 
+from .data_handler import write_excel
+
+# Urutan kolom file baris gagal; sama dengan kunci dict yang dibuat add_failed_row
+_FAILED_ROW_COLUMNS = ("full_text", "invalid_label", "justification", "failure_reason")
+
 class FailedRowHandler:
     def __init__(self, log_folder: Path, source_filename_stem: str):
         """
@@ -46,13 +51,14 @@ class FailedRowHandler:
             logging.info("Tidak ada baris gagal untuk disimpan.")
             return
 
-        new_failures_df = pd.DataFrame(self.failed_rows)
+        # Kolom sudah diketahui, jadi pandas tidak perlu menyimpulkannya dari setiap dict
+        new_failures_df = pd.DataFrame.from_records(self.failed_rows, columns=_FAILED_ROW_COLUMNS)
 
         try:
             # Karena file ini spesifik per sesi, kita tidak perlu menggabungkan (append),
             # cukup tulis saja.
             logging.info(f"Menyimpan {len(new_failures_df)} baris gagal ke: {self.file_path}")
-            new_failures_df.to_excel(self.file_path, index=False)
+            write_excel(new_failures_df, self.file_path)
             logging.info("File baris gagal berhasil disimpan.")
             
             # Kosongkan daftar setelah disimpan
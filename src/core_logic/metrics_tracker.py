@@ -6,14 +6,93 @@ for the AI Studio Auto-Labeling system. It records timestamp, duration,
 row counts, and other performance data for analysis and visualization.
 """
 
-import json
+import atexit
 import csv
+import json
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
+# Buffer size for metrics file handles; fewer write()/read() syscalls on long histories
+IO_BUFFER_SIZE = 1 << 20
+
+# orjson is optional; the stdlib json module is used when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# pyarrow is optional; without it the Parquet copy of the metrics is not written.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+    pq = None
+    pacsv = None
+
+# Directory holding the Parquet copy of execution_metrics.csv, one part file per flush
+PARQUET_DIRNAME = "execution_metrics_parquet"
+
+# Directory holding one Arrow IPC stream of progress samples per session
+PROGRESS_DIRNAME = "progress"
+
+_TIMESTAMP_COLUMNS = ("start_timestamp", "end_timestamp")
+
+
+def _arrow_column_types() -> Dict:
+    """Explicit Arrow types for the execution metrics columns."""
+    return {
+        "session_id": pa.string(),
+        "start_timestamp": pa.timestamp('us'),
+        "end_timestamp": pa.timestamp('us'),
+        "duration_seconds": pa.float64(),
+        "duration_minutes": pa.float64(),
+        "total_rows": pa.int64(),
+        "processed_rows": pa.int64(),
+        "failed_rows": pa.int64(),
+        "batch_count": pa.int64(),
+        "batch_size": pa.int64(),
+        "success_rate": pa.float64(),
+        "rows_per_second": pa.float64(),
+        "avg_batch_processing_time": pa.float64(),
+        "status": pa.string(),
+        "dataset_file": pa.string(),
+    }
+
+
+def _progress_schema():
+    """Arrow schema of the per-update progress samples."""
+    return pa.schema([
+        ("timestamp", pa.timestamp('us')),
+        ("processed_rows", pa.int64()),
+        ("failed_rows", pa.int64()),
+        ("batch_count", pa.int32()),
+    ])
+
+
+def _dumps_record(record: Dict) -> str:
+    """Serialize one metrics record as a single JSON line (without the newline)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(record).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _loads_record(line: bytes) -> Dict:
+    """Parse one UTF-8 JSON line; orjson's decode error subclasses json.JSONDecodeError."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
 class ExecutionMetricsTracker:
     """
     Tracks and stores execution metrics for performance analysis.
@@ -30,28 +109,110 @@ class ExecutionMetricsTracker:
     - session_id: Unique identifier for this execution
     """
     
-    def __init__(self, metrics_dir: str = "execution_metrics"):
+    # Column order for execution_metrics.csv
+    CSV_COLUMNS = (
+        "session_id", "start_timestamp", "end_timestamp", 
+        "duration_seconds", "duration_minutes", "total_rows", 
+        "processed_rows", "failed_rows", "batch_count", "batch_size",
+        "success_rate", "rows_per_second", "avg_batch_processing_time",
+        "status", "dataset_file"
+    )
+    
+    # Columns optimized for analysis in export_for_analysis
+    ANALYSIS_COLUMNS = (
+        "session_id", "start_timestamp", "duration_seconds", 
+        "total_rows", "processed_rows", "success_rate",
+        "batch_count", "batch_size", "rows_per_second"
+    )
+    
+    def __init__(self, metrics_dir: str = "execution_metrics", flush_every: int = 1):
         """
         Initialize the metrics tracker.
         
         Args:
             metrics_dir: Directory to store metrics files
+            flush_every: Number of finished sessions to buffer before writing them
+                to disk. Pending sessions are also written at interpreter exit and
+                before any read of the metrics files.
         """
         self.metrics_dir = Path(metrics_dir)
         self.metrics_dir.mkdir(exist_ok=True)
         
+        # Finished sessions not yet written to disk
+        self._pending: List[Dict] = []
+        self._flush_every = max(1, flush_every)
+        self._flush_lock = threading.Lock()
+        atexit.register(self._flush)
+        
         # Current session data
         self.session_id = None
         self.start_time = None
         self.session_data = {}
         
-        # File paths
-        self.json_file = self.metrics_dir / "execution_metrics.json"
+        # Binary progress log of the current session (only with pyarrow)
+        self._progress_sink = None
+        self._progress_writer = None
+        
+        # File paths. Sessions are appended to a JSON Lines file (one record per line),
+        # so saving a session never rewrites the accumulated history.
+        self.json_file = self.metrics_dir / "execution_metrics.jsonl"
+        self.legacy_json_file = self.metrics_dir / "execution_metrics.json"
         self.csv_file = self.metrics_dir / "execution_metrics.csv"
+        self.parquet_dir = self.metrics_dir / PARQUET_DIRNAME
+        self.progress_dir = self.metrics_dir / PROGRESS_DIRNAME
+        # Whether the CSV already has its header; probed with one stat() on first save
+        self._csv_header_written: Optional[bool] = None
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
+        self._migrate_legacy_json()
+        self._seed_parquet_from_csv()
+    
+    def _migrate_legacy_json(self):
+        """Convert a legacy {"executions": [...]} file to JSON Lines once."""
+        if self.json_file.exists() or not self.legacy_json_file.exists():
+            return
+        try:
+            with open(self.legacy_json_file, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                executions = json.load(f).get("executions", [])
+            with open(self.json_file, 'w', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                for execution in executions:
+                    f.write(_dumps_record(execution) + '\n')
+            self.legacy_json_file.rename(self.legacy_json_file.with_name(self.legacy_json_file.name + ".bak"))
+            self.logger.info(f"Migrated {len(executions)} executions to {self.json_file}")
+        except Exception as e:
+            self.logger.error(f"Failed to migrate legacy JSON metrics: {e}")
+    
+    def _seed_parquet_from_csv(self):
+        """Copy the existing CSV history into the Parquet dataset the first time it is created."""
+        if pa is None or self.parquet_dir.exists() or not self.csv_file.exists():
+            return
+        try:
+            table = pacsv.read_csv(
+                self.csv_file,
+                convert_options=pacsv.ConvertOptions(column_types=_arrow_column_types())
+            )
+            self.parquet_dir.mkdir(exist_ok=True)
+            pq.write_table(table, self.parquet_dir / "part-00000000_000000_000000.parquet", compression='zstd')
+            self.logger.info(f"Seeded {self.parquet_dir} with {table.num_rows} executions from CSV")
+        except Exception as e:
+            self.logger.error(f"Failed to seed Parquet metrics from CSV: {e}")
+    
+    def _iter_executions(self) -> Iterator[Dict]:
+        """Yield execution records from the JSON Lines file one at a time."""
+        # Lines are parsed straight from bytes, skipping the intermediate str decode
+        with open(self.json_file, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield _loads_record(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    self.logger.warning("Skipping malformed metrics line")
+        
     def start_session(self, dataset_file: str, total_rows: int, batch_size: int) -> str:
         """
         Start a new execution session.
@@ -64,13 +225,14 @@ class ExecutionMetricsTracker:
         Returns:
             session_id: Unique identifier for this session
         """
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        self.session_id = now.strftime("%Y%m%d_%H%M%S")
         self.start_time = time.time()
         
         self.session_data = {
             "session_id": self.session_id,
             "dataset_file": str(dataset_file),
-            "start_timestamp": datetime.now().isoformat(),
+            "start_timestamp": now.isoformat(),
             "total_rows": total_rows,
             "batch_size": batch_size,
             "processed_rows": 0,
@@ -81,6 +243,8 @@ class ExecutionMetricsTracker:
             "status": "running"
         }
         
+        self._open_progress_log()
+        
         self.logger.info(f"Started metrics tracking session: {self.session_id}")
         return self.session_id
     
@@ -103,6 +267,46 @@ class ExecutionMetricsTracker:
             "batch_count": batch_count,
             "success_rate": (processed_rows / max(1, processed_rows + failed_rows)) * 100
         })
+        self._write_progress_sample(processed_rows, failed_rows, batch_count)
+    
+    def _open_progress_log(self):
+        """Start the Arrow IPC stream <progress_dir>/<session_id>.arrow for this session."""
+        self._close_progress_log()
+        if pa is None:
+            return
+        try:
+            self.progress_dir.mkdir(exist_ok=True)
+            self._progress_sink = pa.OSFile(str(self.progress_dir / f"{self.session_id}.arrow"), 'wb')
+            self._progress_writer = pa.ipc.new_stream(self._progress_sink, _progress_schema())
+        except Exception as e:
+            self.logger.error(f"Failed to open progress log: {e}")
+            self._close_progress_log()
+    
+    def _write_progress_sample(self, processed_rows: int, failed_rows: int, batch_count: int):
+        """Append one progress sample as a single-row record batch."""
+        if self._progress_writer is None:
+            return
+        try:
+            self._progress_writer.write_batch(pa.record_batch(
+                [[datetime.now()], [processed_rows], [failed_rows], [batch_count]],
+                schema=_progress_schema()
+            ))
+        except Exception as e:
+            self.logger.error(f"Failed to write progress sample: {e}")
+            self._close_progress_log()
+    
+    def _close_progress_log(self):
+        """Finish the current progress stream, if any."""
+        writer, sink = self._progress_writer, self._progress_sink
+        self._progress_writer = None
+        self._progress_sink = None
+        try:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+        except Exception as e:
+            self.logger.error(f"Failed to close progress log: {e}")
     
     def end_session(self, status: str = "completed") -> Dict:
         """
@@ -131,9 +335,12 @@ class ExecutionMetricsTracker:
             "avg_batch_processing_time": round(duration / max(1, self.session_data["batch_count"]), 2)
         })
         
-        # Save to files
-        self._save_to_json()
-        self._save_to_csv()
+        self._close_progress_log()
+        
+        # Buffer and save to files once enough sessions are pending
+        self._pending.append(dict(self.session_data))
+        if len(self._pending) >= self._flush_every:
+            self._flush()
         
         self.logger.info(f"Completed metrics tracking session: {self.session_id}")
         self.logger.info(f"Duration: {duration:.2f}s, Processed: {self.session_data['processed_rows']} rows")
@@ -146,55 +353,66 @@ class ExecutionMetricsTracker:
         
         return session_data
     
-    def _save_to_json(self):
-        """Save metrics to JSON file for detailed analysis."""
+    def _flush(self):
+        """Write all pending sessions, opening each metrics file once."""
+        with self._flush_lock:
+            if not self._pending:
+                return
+            records, self._pending = self._pending, []
+            self._save_to_json(records)
+            self._save_to_csv(records)
+            self._save_to_parquet(records)
+    
+    def _save_to_json(self, records: List[Dict]):
+        """Append sessions to the JSON Lines file for detailed analysis."""
         try:
-            # Load existing data
-            if self.json_file.exists():
-                with open(self.json_file, 'r', encoding='utf-8', errors='replace') as f:
-                    data = json.load(f)
-            else:
-                data = {"executions": []}
-            
-            # Add current session
-            data["executions"].append(self.session_data)
-            
-            # Save back to file
-            with open(self.json_file, 'w', encoding='utf-8', errors='replace') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+            with open(self.json_file, 'a', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                f.writelines(_dumps_record(record) + '\n' for record in records)
         except Exception as e:
             self.logger.error(f"Failed to save JSON metrics: {e}")
     
-    def _save_to_csv(self):
-        """Save metrics to CSV file for easy analysis and plotting."""
+    def _save_to_csv(self, records: List[Dict]):
+        """Save sessions to CSV file for easy analysis and plotting."""
         try:
-            # Define CSV columns
-            columns = [
-                "session_id", "start_timestamp", "end_timestamp", 
-                "duration_seconds", "duration_minutes", "total_rows", 
-                "processed_rows", "failed_rows", "batch_count", "batch_size",
-                "success_rate", "rows_per_second", "avg_batch_processing_time",
-                "status", "dataset_file"
-            ]
-            
-            # Check if file exists to determine if we need headers
-            file_exists = self.csv_file.exists()
+            # Check once if file exists to determine if we need headers
+            if self._csv_header_written is None:
+                self._csv_header_written = self.csv_file.exists()
             
             # Write to CSV
-            with open(self.csv_file, 'a', newline='', encoding='utf-8', errors='replace') as f:
-                writer = csv.DictWriter(f, fieldnames=columns)
+            with open(self.csv_file, 'a', newline='', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                writer = csv.writer(f)
                 
-                if not file_exists:
-                    writer.writeheader()
+                if not self._csv_header_written:
+                    writer.writerow(self.CSV_COLUMNS)
+                    self._csv_header_written = True
                 
-                # Write only the columns that exist in session_data
-                row_data = {col: self.session_data.get(col, '') for col in columns}
-                writer.writerow(row_data)
+                # Write only the columns that exist in each session
+                writer.writerows([record.get(col, '') for col in self.CSV_COLUMNS] for record in records)
                 
         except Exception as e:
             self.logger.error(f"Failed to save CSV metrics: {e}")
     
+    def _save_to_parquet(self, records: List[Dict]):
+        """Write sessions as a new ZSTD-compressed part of the Parquet dataset (needs pyarrow)."""
+        if pa is None:
+            return
+        try:
+            rows = []
+            for record in records:
+                row = {col: record.get(col) for col in self.CSV_COLUMNS}
+                for col in _TIMESTAMP_COLUMNS:
+                    if row[col]:
+                        row[col] = datetime.fromisoformat(row[col])
+                rows.append(row)
+            table = pa.Table.from_pylist(rows, schema=pa.schema(_arrow_column_types()))
+            
+            self.parquet_dir.mkdir(exist_ok=True)
+            # Part names sort chronologically, so reading the directory keeps session order
+            part_name = f"part-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet"
+            pq.write_table(table, self.parquet_dir / part_name, compression='zstd')
+        except Exception as e:
+            self.logger.error(f"Failed to save Parquet metrics: {e}")
+    
     def get_metrics_summary(self, days: int = 30) -> Dict:
         """
         Get summary statistics for recent executions.
@@ -205,43 +423,56 @@ class ExecutionMetricsTracker:
         Returns:
             Dictionary with summary statistics
         """
+        self._flush()
         try:
             if not self.json_file.exists():
                 return {"error": "No metrics data available"}
             
-            with open(self.json_file, 'r', encoding='utf-8', errors='replace') as f:
-                data = json.load(f)
+            # Filter recent executions and accumulate the statistics in one streaming pass
+            # start_timestamp is written by datetime.isoformat(), so ISO strings compare in time order
+            cutoff_str = (datetime.now() - timedelta(days=days)).isoformat()
+            any_executions = False
+            count = 0
+            duration_sum = success_sum = 0.0
+            rows_sum = 0
+            duration_min = duration_max = rows_min = rows_max = None
+            for ex in self._iter_executions():
+                any_executions = True
+                if ex.get("start_timestamp", "") <= cutoff_str:
+                    continue
+                
+                duration = ex.get("duration_seconds", 0)
+                rows = ex.get("processed_rows", 0)
+                count += 1
+                duration_sum += duration
+                rows_sum += rows
+                success_sum += ex.get("success_rate", 0)
+                if count == 1:
+                    duration_min = duration_max = duration
+                    rows_min = rows_max = rows
+                else:
+                    duration_min = min(duration_min, duration)
+                    duration_max = max(duration_max, duration)
+                    rows_min = min(rows_min, rows)
+                    rows_max = max(rows_max, rows)
             
-            executions = data.get("executions", [])
-            if not executions:
+            if not any_executions:
                 return {"error": "No execution data found"}
             
-            # Filter recent executions
-            cutoff_date = datetime.now() - timedelta(days=days)
-            recent_executions = [
-                ex for ex in executions 
-                if datetime.fromisoformat(ex.get("start_timestamp", "")) > cutoff_date
-            ]
-            
-            if not recent_executions:
+            if not count:
                 return {"error": f"No executions found in the last {days} days"}
             
-            # Calculate summary statistics
-            durations = [ex.get("duration_seconds", 0) for ex in recent_executions]
-            row_counts = [ex.get("processed_rows", 0) for ex in recent_executions]
-            success_rates = [ex.get("success_rate", 0) for ex in recent_executions]
-            
             summary = {
                 "period_days": days,
-                "total_executions": len(recent_executions),
-                "avg_duration_seconds": round(sum(durations) / len(durations), 2),
-                "min_duration_seconds": min(durations),
-                "max_duration_seconds": max(durations),
-                "avg_rows_processed": round(sum(row_counts) / len(row_counts), 2),
-                "min_rows_processed": min(row_counts),
-                "max_rows_processed": max(row_counts),
-                "avg_success_rate": round(sum(success_rates) / len(success_rates), 2),
-                "total_rows_processed": sum(row_counts)
+                "total_executions": count,
+                "avg_duration_seconds": round(duration_sum / count, 2),
+                "min_duration_seconds": duration_min,
+                "max_duration_seconds": duration_max,
+                "avg_rows_processed": round(rows_sum / count, 2),
+                "min_rows_processed": rows_min,
+                "max_rows_processed": rows_max,
+                "avg_success_rate": round(success_sum / count, 2),
+                "total_rows_processed": rows_sum
             }
             
             return summary
@@ -264,29 +495,18 @@ class ExecutionMetricsTracker:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = self.metrics_dir / f"metrics_for_analysis_{timestamp}.csv"
         
+        self._flush()
         try:
             if not self.json_file.exists():
                 raise FileNotFoundError("No metrics data available")
             
-            with open(self.json_file, 'r', encoding='utf-8', errors='replace') as f:
-                data = json.load(f)
-            
-            executions = data.get("executions", [])
-            
-            # Export with columns optimized for analysis
-            analysis_columns = [
-                "session_id", "start_timestamp", "duration_seconds", 
-                "total_rows", "processed_rows", "success_rate",
-                "batch_count", "batch_size", "rows_per_second"
-            ]
-            
-            with open(output_file, 'w', newline='', encoding='utf-8', errors='replace') as f:
-                writer = csv.DictWriter(f, fieldnames=analysis_columns)
-                writer.writeheader()
-                
-                for execution in executions:
-                    row_data = {col: execution.get(col, '') for col in analysis_columns}
-                    writer.writerow(row_data)
+            with open(output_file, 'w', newline='', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                writer = csv.writer(f)
+                writer.writerow(self.ANALYSIS_COLUMNS)
+                writer.writerows(
+                    [execution.get(col, '') for col in self.ANALYSIS_COLUMNS]
+                    for execution in self._iter_executions()
+                )
             
             return str(output_file)
             
@@ -6,23 +6,90 @@ including scatter plots, regression analysis, and performance trend charts.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import json
 from datetime import datetime
-from scipy import stats
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import sys
+
+from .metrics_tracker import IO_BUFFER_SIZE, PARQUET_DIRNAME, _arrow_column_types
+
+# Optional: pyarrow's multithreaded C++ CSV reader and Parquet support, with pandas as the fallback.
+try:
+    from pyarrow import csv as pacsv
+except ImportError:
+    pacsv = None
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# load_data always needs these columns to filter out invalid executions
+_FILTER_COLUMNS = ['duration_seconds', 'processed_rows']
+
+# Plots of the comprehensive analysis dashboard, in output order
+_DASHBOARD_PLOTS = ('scatter', 'trends', 'distributions', 'correlations')
+
+def _ols1d(x: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """
+    Closed-form simple linear regression of y on x.
+    
+    Returns:
+        Dictionary with slope, intercept, r (correlation), r_squared and the
+        standard error of the slope
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = float(dx @ dx)
+    syy = float(dy @ dy)
+    sxy = float(dx @ dy)
+    
+    slope = sxy / sxx if sxx else 0.0
+    intercept = float(y.mean() - slope * x.mean())
+    r = sxy / np.sqrt(sxx * syy) if sxx and syy else 0.0
+    r = float(np.clip(r, -1.0, 1.0))
+    
+    ss_res = max(0.0, syy - slope * sxy)
+    std_err = float(np.sqrt(ss_res / (n - 2) / sxx)) if n > 2 and sxx else 0.0
+    
+    return {
+        "slope": float(slope),
+        "intercept": intercept,
+        "r": r,
+        "r_squared": r * r,
+        "std_err": std_err,
+    }
+
+def _is_headless() -> bool:
+    """True when no display is available and no backend was chosen explicitly."""
+    if os.environ.get('MPLBACKEND') or sys.platform in ('win32', 'darwin'):
+        return False
+    return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
 
 class MetricsVisualizer:
     """
     Creates visualizations and analysis from execution metrics data.
     """
     
+    # (column, title, y-label, marker, color) for each performance trend panel
+    _TREND_PANELS = (
+        ('duration_seconds', 'Processing Duration Over Time', 'Duration (seconds)', 'o', 'C0'),
+        ('processed_rows', 'Rows Processed Over Time', 'Number of Rows', 's', 'green'),
+        ('success_rate', 'Success Rate Over Time', 'Success Rate (%)', '^', 'orange'),
+        ('rows_per_second', 'Processing Speed Over Time', 'Rows per Second', 'd', 'purple'),
+    )
+    
     def __init__(self, metrics_dir: str = "execution_metrics"):
         """
         Initialize the visualizer.
@@ -31,74 +98,165 @@ class MetricsVisualizer:
             metrics_dir: Directory containing metrics files
         """
         self.metrics_dir = Path(metrics_dir)
-        self.json_file = self.metrics_dir / "execution_metrics.json"
+        self.json_file = self.metrics_dir / "execution_metrics.jsonl"
         self.csv_file = self.metrics_dir / "execution_metrics.csv"
+        self.parquet_dir = self.metrics_dir / PARQUET_DIRNAME
         self.output_dir = self.metrics_dir / "visualizations"
         self.output_dir.mkdir(exist_ok=True)
         
         self.logger = logging.getLogger(__name__)
         
-        # Set up plotting style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+        # (source signature, loaded columns or None for all, filtered DataFrame)
+        self._df_cache: Optional[Tuple[tuple, Optional[frozenset], pd.DataFrame]] = None
+        
+        # Plotting libraries are imported and styled on first use (see _pyplot), so
+        # loading data or running the regression does not pay for matplotlib/seaborn.
+        self._style_ready = False
+    
+    def _pyplot(self):
+        """Import matplotlib.pyplot, applying the plotting style once."""
+        import matplotlib
+        if not self._style_ready and _is_headless():
+            # No display available: skip GUI backend initialisation entirely
+            matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        if not self._style_ready:
+            import seaborn as sns
+            plt.style.use('seaborn-v0_8')
+            sns.set_palette("husl")
+            self._style_ready = True
+        return plt
     
-    def load_data(self) -> pd.DataFrame:
+    def load_data(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
-        Load metrics data from CSV file.
+        Load metrics data, preferring the Parquet dataset over the CSV file.
+        
+        The Parquet dataset is only used when it holds at least as many rows as
+        the CSV file; sessions written while pyarrow was unavailable (or whose
+        Parquet write failed) exist only in the CSV, which is then read instead.
+        
+        Args:
+            columns: Columns to load (None for all). Only applies to the Parquet
+                dataset, which can skip the other columns entirely.
         
         Returns:
             DataFrame with metrics data
         """
         try:
-            if not self.csv_file.exists():
-                raise FileNotFoundError(f"Metrics file not found: {self.csv_file}")
-            
-            df = pd.read_csv(self.csv_file)
+            signature = self._source_signature()
+            if self._df_cache is not None:
+                cached_signature, cached_columns, cached_df = self._df_cache
+                if cached_signature == signature and (
+                    cached_columns is None or (columns is not None and set(columns) <= cached_columns)
+                ):
+                    return cached_df
             
-            # Convert timestamp columns
-            if 'start_timestamp' in df.columns:
-                df['start_timestamp'] = pd.to_datetime(df['start_timestamp'])
-            if 'end_timestamp' in df.columns:
-                df['end_timestamp'] = pd.to_datetime(df['end_timestamp'])
+            if self._parquet_is_complete():
+                wanted = None if columns is None else list(dict.fromkeys(list(columns) + _FILTER_COLUMNS))
+                df = pd.read_parquet(self.parquet_dir, columns=wanted)
+            elif not self.csv_file.exists():
+                raise FileNotFoundError(f"Metrics file not found: {self.csv_file}")
+            elif pacsv is not None:
+                # Arrow parses the timestamp columns itself via the explicit column types
+                table = pacsv.read_csv(
+                    self.csv_file,
+                    convert_options=pacsv.ConvertOptions(column_types=_arrow_column_types())
+                )
+                df = table.to_pandas(split_blocks=True, self_destruct=True)
+            else:
+                with open(self.csv_file, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+                    df = pd.read_csv(f)
+                
+                # Convert timestamp columns
+                if 'start_timestamp' in df.columns:
+                    df['start_timestamp'] = pd.to_datetime(df['start_timestamp'])
+                if 'end_timestamp' in df.columns:
+                    df['end_timestamp'] = pd.to_datetime(df['end_timestamp'])
             
             # Filter out invalid data
             df = df[(df['duration_seconds'] > 0) & (df['processed_rows'] > 0)]
             
             self.logger.info(f"Loaded {len(df)} execution records")
+            self._df_cache = (signature, None if columns is None else frozenset(df.columns), df)
             return df
             
         except Exception as e:
             self.logger.error(f"Failed to load metrics data: {e}")
             raise
     
-    def create_duration_vs_rows_scatter(self, save_plot: bool = True) -> str:
+    def _parquet_is_complete(self) -> bool:
+        """Whether the Parquet dataset exists and has no fewer rows than the CSV file."""
+        if pq is None or not self.parquet_dir.is_dir():
+            return False
+        parts = list(self.parquet_dir.glob("*.parquet"))
+        if not parts:
+            return False
+        if not self.csv_file.exists():
+            return True
+        
+        try:
+            # Row counts come from the Parquet footers; no column data is read
+            parquet_rows = sum(pq.read_metadata(part).num_rows for part in parts)
+        except Exception as e:
+            self.logger.warning(f"Could not read Parquet metadata, using CSV instead: {e}")
+            return False
+        with open(self.csv_file, 'rb') as f:
+            # One record per line (no field contains a newline), minus the header
+            csv_rows = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(IO_BUFFER_SIZE), b'')) - 1
+        
+        if parquet_rows < csv_rows:
+            self.logger.warning(
+                f"Parquet dataset has {parquet_rows} rows but the CSV has {csv_rows}; loading the CSV"
+            )
+            return False
+        return True
+    
+    def _source_signature(self) -> tuple:
+        """Modification times of the metrics files; changes whenever new sessions are written."""
+        signature = []
+        if self.parquet_dir.is_dir():
+            signature.extend((part.name, part.stat().st_mtime_ns) for part in sorted(self.parquet_dir.glob("*.parquet")))
+        if self.csv_file.exists():
+            stat = self.csv_file.stat()
+            signature.append((self.csv_file.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+    
+    def create_duration_vs_rows_scatter(self, save_plot: bool = True, df: Optional[pd.DataFrame] = None,
+                                        timestamp: Optional[str] = None) -> Union[str, 'Figure']:
         """
         Create scatter plot of duration vs number of rows with regression line.
         
         Args:
             save_plot: Whether to save the plot to file
+            df: Already loaded metrics data (loaded here if None)
             
         Returns:
-            Path to saved plot file
+            Path to saved plot file, or the open Figure when save_plot is False
         """
-        df = self.load_data()
+        if df is None:
+            df = self.load_data(columns=['processed_rows', 'duration_seconds'])
         
         if len(df) < 2:
             raise ValueError("Need at least 2 data points for scatter plot")
         
+        plt = self._pyplot()
+        
         # Create figure and axis
-        plt.figure(figsize=(12, 8))
+        fig = plt.figure(figsize=(12, 8))
+        
+        # float64 views of the columns (no copy when they already are float64)
+        x = df['processed_rows'].to_numpy(dtype=np.float64, copy=False)
+        y = df['duration_seconds'].to_numpy(dtype=np.float64, copy=False)
         
         # Create scatter plot
-        plt.scatter(df['processed_rows'], df['duration_seconds'], 
-                   alpha=0.6, s=60, edgecolors='black', linewidth=0.5)
+        plt.scatter(x, y, alpha=0.6, s=60, edgecolors='black', linewidth=0.5)
         
         # Add regression line
-        x = df['processed_rows'].values
-        y = df['duration_seconds'].values
         
         # Calculate linear regression
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+        fit = _ols1d(x, y)
+        slope, intercept, r_value, std_err = fit["slope"], fit["intercept"], fit["r"], fit["std_err"]
+        p_value = self._slope_p_value(r_value, len(x))
         line_x = np.linspace(x.min(), x.max(), 100)
         line_y = slope * line_x + intercept
         
@@ -129,26 +287,30 @@ Data Points: {len(df)}"""
         plt.tight_layout()
         
         if save_plot:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
             plot_file = self.output_dir / f"duration_vs_rows_scatter_{timestamp}.png"
             plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
             self.logger.info(f"Saved scatter plot: {plot_file}")
             return str(plot_file)
         
-        plt.show()
-        return ""
+        return fig
     
-    def create_performance_trends(self, save_plot: bool = True) -> str:
+    def create_performance_trends(self, save_plot: bool = True, df: Optional[pd.DataFrame] = None,
+                                  timestamp: Optional[str] = None) -> Union[str, 'Figure']:
         """
         Create performance trends over time.
         
         Args:
             save_plot: Whether to save the plot to file
+            df: Already loaded metrics data (loaded here if None)
             
         Returns:
-            Path to saved plot file
+            Path to saved plot file, or the open Figure when save_plot is False
         """
-        df = self.load_data()
+        if df is None:
+            df = self.load_data(columns=['start_timestamp', 'duration_seconds', 'processed_rows',
+                                         'success_rate', 'rows_per_second'])
         
         if len(df) < 2:
             raise ValueError("Need at least 2 data points for trends")
@@ -156,56 +318,38 @@ Data Points: {len(df)}"""
         # Sort by timestamp
         df = df.sort_values('start_timestamp')
         
-        # Create subplots
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        # Draw all four panels in one pandas call, then label them in one loop
+        plt = self._pyplot()
+        columns = [panel[0] for panel in self._TREND_PANELS]
+        axes = df.set_index('start_timestamp')[columns].plot(
+            subplots=True, layout=(2, 2), figsize=(15, 10), sharex=False, legend=False,
+            style=[f"{panel[3]}-" for panel in self._TREND_PANELS],
+            color=[panel[4] for panel in self._TREND_PANELS],
+            linewidth=2, markersize=4)
+        fig = axes[0, 0].get_figure()
         fig.suptitle('Execution Performance Trends Over Time', fontsize=16, fontweight='bold')
         
-        # 1. Duration over time
-        axes[0, 0].plot(df['start_timestamp'], df['duration_seconds'], 
-                       marker='o', linewidth=2, markersize=4)
-        axes[0, 0].set_title('Processing Duration Over Time')
-        axes[0, 0].set_ylabel('Duration (seconds)')
-        axes[0, 0].tick_params(axis='x', rotation=45)
-        axes[0, 0].grid(True, alpha=0.3)
-        
-        # 2. Rows processed over time
-        axes[0, 1].plot(df['start_timestamp'], df['processed_rows'], 
-                       marker='s', color='green', linewidth=2, markersize=4)
-        axes[0, 1].set_title('Rows Processed Over Time')
-        axes[0, 1].set_ylabel('Number of Rows')
-        axes[0, 1].tick_params(axis='x', rotation=45)
-        axes[0, 1].grid(True, alpha=0.3)
-        
-        # 3. Success rate over time
-        axes[1, 0].plot(df['start_timestamp'], df['success_rate'], 
-                       marker='^', color='orange', linewidth=2, markersize=4)
-        axes[1, 0].set_title('Success Rate Over Time')
-        axes[1, 0].set_ylabel('Success Rate (%)')
+        for ax, (_, title, ylabel, _, _) in zip(axes.flat, self._TREND_PANELS):
+            ax.set_title(title)
+            ax.set_xlabel('')
+            ax.set_ylabel(ylabel)
+            ax.tick_params(axis='x', rotation=45)
+            ax.grid(True, alpha=0.3)
         axes[1, 0].set_ylim(0, 100)
-        axes[1, 0].tick_params(axis='x', rotation=45)
-        axes[1, 0].grid(True, alpha=0.3)
-        
-        # 4. Processing speed over time
-        axes[1, 1].plot(df['start_timestamp'], df['rows_per_second'], 
-                       marker='d', color='purple', linewidth=2, markersize=4)
-        axes[1, 1].set_title('Processing Speed Over Time')
-        axes[1, 1].set_ylabel('Rows per Second')
-        axes[1, 1].tick_params(axis='x', rotation=45)
-        axes[1, 1].grid(True, alpha=0.3)
         
         plt.tight_layout()
         
         if save_plot:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
             plot_file = self.output_dir / f"performance_trends_{timestamp}.png"
             plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
             self.logger.info(f"Saved trends plot: {plot_file}")
             return str(plot_file)
         
-        plt.show()
-        return ""
+        return fig
     
-    def create_comprehensive_analysis(self, save_plot: bool = True) -> Dict[str, str]:
+    def create_comprehensive_analysis(self, save_plot: bool = True) -> Dict[str, Union[str, 'Figure']]:
         """
         Create comprehensive analysis dashboard with multiple visualizations.
         
@@ -213,31 +357,49 @@ Data Points: {len(df)}"""
             save_plot: Whether to save plots to files
             
         Returns:
-            Dictionary with paths to saved plot files
+            Dictionary with paths to saved plot files (figures when save_plot is False)
         """
         df = self.load_data()
         
         if len(df) < 2:
             raise ValueError("Need at least 2 data points for analysis")
         
-        plots = {}
-        
-        # 1. Main scatter plot with regression
-        plots['scatter'] = self.create_duration_vs_rows_scatter(save_plot)
-        
-        # 2. Performance trends
-        plots['trends'] = self.create_performance_trends(save_plot)
-        
-        # 3. Distribution analysis
-        plots['distributions'] = self._create_distributions_plot(df, save_plot)
-        
-        # 4. Correlation matrix
-        plots['correlations'] = self._create_correlation_matrix(df, save_plot)
-        
-        return plots
+        # One timestamp shared by every plot of this analysis run
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Saved plots are independent and dominated by rendering/PNG encoding,
+        # so they are drawn in parallel worker processes when possible
+        workers = min(len(_DASHBOARD_PLOTS), os.cpu_count() or 1)
+        if save_plot and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        kind: executor.submit(_render_saved_plot, str(self.metrics_dir), kind, df, timestamp)
+                        for kind in _DASHBOARD_PLOTS
+                    }
+                    return {kind: future.result() for kind, future in futures.items()}
+            except (OSError, BrokenProcessPool) as e:
+                self.logger.warning(f"Parallel plotting unavailable ({e}), rendering plots sequentially")
+        
+        return {kind: self._render_plot(kind, df, save_plot, timestamp) for kind in _DASHBOARD_PLOTS}
     
-    def _create_distributions_plot(self, df: pd.DataFrame, save_plot: bool) -> str:
+    def _render_plot(self, kind: str, df: pd.DataFrame, save_plot: bool,
+                     timestamp: Optional[str] = None) -> Union[str, 'Figure']:
+        """Draw one of the dashboard plots named in _DASHBOARD_PLOTS."""
+        if kind == 'scatter':
+            return self.create_duration_vs_rows_scatter(save_plot, df=df, timestamp=timestamp)
+        if kind == 'trends':
+            return self.create_performance_trends(save_plot, df=df, timestamp=timestamp)
+        if kind == 'distributions':
+            return self._create_distributions_plot(df, save_plot, timestamp)
+        if kind == 'correlations':
+            return self._create_correlation_matrix(df, save_plot, timestamp)
+        raise ValueError(f"Unknown plot type: {kind}")
+    
+    def _create_distributions_plot(self, df: pd.DataFrame, save_plot: bool,
+                                   timestamp: Optional[str] = None) -> Union[str, 'Figure']:
         """Create distribution plots for key metrics."""
+        plt = self._pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle('Metrics Distributions', fontsize=16, fontweight='bold')
         
@@ -268,15 +430,16 @@ Data Points: {len(df)}"""
         plt.tight_layout()
         
         if save_plot:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
             plot_file = self.output_dir / f"distributions_{timestamp}.png"
             plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
             return str(plot_file)
         
-        plt.show()
-        return ""
+        return fig
     
-    def _create_correlation_matrix(self, df: pd.DataFrame, save_plot: bool) -> str:
+    def _create_correlation_matrix(self, df: pd.DataFrame, save_plot: bool,
+                                   timestamp: Optional[str] = None) -> Union[str, 'Figure']:
         """Create correlation matrix heatmap."""
         # Select numeric columns for correlation
         numeric_cols = ['duration_seconds', 'processed_rows', 'batch_count', 
@@ -284,26 +447,43 @@ Data Points: {len(df)}"""
         
         # Filter to existing columns
         available_cols = [col for col in numeric_cols if col in df.columns]
-        correlation_df = df[available_cols]
+        values = df[available_cols].to_numpy(dtype=np.float64)
         
-        # Calculate correlation matrix
-        corr_matrix = correlation_df.corr()
+        # Calculate correlation matrix in one NumPy call; pandas' pairwise corr()
+        # is only needed when missing values have to be excluded per column pair
+        if np.isnan(values).any():
+            corr_matrix = df[available_cols].corr()
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = np.corrcoef(values, rowvar=False)
+            corr_matrix = pd.DataFrame(corr, index=available_cols, columns=available_cols)
         
         # Create heatmap
-        plt.figure(figsize=(10, 8))
+        import seaborn as sns
+        plt = self._pyplot()
+        fig = plt.figure(figsize=(10, 8))
         sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0,
                    square=True, fmt='.3f', cbar_kws={'label': 'Correlation Coefficient'})
         plt.title('Metrics Correlation Matrix', fontsize=14, fontweight='bold', pad=20)
         plt.tight_layout()
         
         if save_plot:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
             plot_file = self.output_dir / f"correlations_{timestamp}.png"
             plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+            plt.close(fig)
             return str(plot_file)
         
-        plt.show()
-        return ""
+        return fig
+    
+    @staticmethod
+    def _slope_p_value(r: float, n: int) -> float:
+        """Two-sided p-value of the slope's t-statistic (same test as scipy.stats.linregress)."""
+        if n <= 2 or abs(r) >= 1.0:
+            return 0.0
+        from scipy import stats
+        t = r * np.sqrt((n - 2) / (1.0 - r * r))
+        return float(2 * stats.t.sf(abs(t), n - 2))
     
     def get_regression_analysis(self) -> Dict:
         """
@@ -312,26 +492,22 @@ Data Points: {len(df)}"""
         Returns:
             Dictionary with regression statistics and predictions
         """
-        df = self.load_data()
+        df = self.load_data(columns=['processed_rows', 'duration_seconds'])
         
         if len(df) < 2:
             raise ValueError("Need at least 2 data points for regression")
         
-        x = df['processed_rows'].values.reshape(-1, 1)
-        y = df['duration_seconds'].values
+        x = df['processed_rows'].to_numpy(dtype=np.float64, copy=False)
+        y = df['duration_seconds'].to_numpy(dtype=np.float64, copy=False)
         
         # Linear regression
-        model = LinearRegression()
-        model.fit(x, y)
-        y_pred = model.predict(x)
+        fit = _ols1d(x, y)
+        slope = fit["slope"]
+        intercept = fit["intercept"]
         
         # Statistics
-        r2 = r2_score(y, y_pred)
-        slope = model.coef_[0]
-        intercept = model.intercept_
-        
-        # Additional statistics
-        correlation = np.corrcoef(x.flatten(), y)[0, 1]
+        r2 = fit["r_squared"]
+        correlation = fit["r"]
         
         analysis = {
             "model": {
@@ -347,10 +523,10 @@ Data Points: {len(df)}"""
                 "mean_rows": float(df['processed_rows'].mean())
             },
             "predictions": {
-                "100_rows": float(model.predict([[100]])[0]),
-                "500_rows": float(model.predict([[500]])[0]),
-                "1000_rows": float(model.predict([[1000]])[0]),
-                "5000_rows": float(model.predict([[5000]])[0])
+                "100_rows": slope * 100 + intercept,
+                "500_rows": slope * 500 + intercept,
+                "1000_rows": slope * 1000 + intercept,
+                "5000_rows": slope * 5000 + intercept
             }
         }
         
@@ -375,6 +551,11 @@ Data Points: {len(df)}"""
         # Get regression analysis
         regression = self.get_regression_analysis()
         
+        # Trend = sign of the OLS slope over execution order (uses every run, not just first/last)
+        t = np.arange(len(df), dtype=np.float64)
+        slopes = {col: _ols1d(t, df[col].to_numpy(dtype=np.float64))['slope']
+                  for col in ('duration_seconds', 'success_rate', 'rows_per_second')}
+        
         # Generate report content
         report = f"""
 EXECUTION METRICS ANALYSIS REPORT
@@ -405,13 +586,20 @@ PERFORMANCE PREDICTIONS:
 - 5000 rows: {regression['predictions']['5000_rows']:.2f} seconds
 
 TRENDS:
-- Duration trend: {"Improving" if df['duration_seconds'].iloc[-1] < df['duration_seconds'].iloc[0] else "Stable/Declining"}
-- Success rate trend: {"Improving" if df['success_rate'].iloc[-1] > df['success_rate'].iloc[0] else "Stable/Declining"}
-- Processing speed trend: {"Improving" if df['rows_per_second'].iloc[-1] > df['rows_per_second'].iloc[0] else "Stable/Declining"}
+- Duration trend: {"Improving" if slopes['duration_seconds'] < 0 else "Stable/Declining"}
+- Success rate trend: {"Improving" if slopes['success_rate'] > 0 else "Stable/Declining"}
+- Processing speed trend: {"Improving" if slopes['rows_per_second'] > 0 else "Stable/Declining"}
 """
         
-        with open(output_file, 'w', encoding='utf-8', errors='replace') as f:
+        with open(output_file, 'w', encoding='utf-8') as f:
             f.write(report)
         
         self.logger.info(f"Generated analysis report: {output_file}")
-        return str(output_file)
\ No newline at end of file
+        return str(output_file)
+
+
+def _render_saved_plot(metrics_dir: str, kind: str, df: pd.DataFrame, timestamp: str) -> str:
+    """Worker-process entry point: draw and save one dashboard plot with the Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    return MetricsVisualizer(metrics_dir)._render_plot(kind, df, True, timestamp)
@@ -1,7 +1,40 @@
+import io
 import logging
 import re
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any
 
+# Pola tag HTML dikompilasi sekali di level modul karena dipakai untuk setiap baris respons
+_HTML_TAG_RE = re.compile(r'<.*?>')
+
+@lru_cache(maxsize=8)
+def _label_prefixes(labels: frozenset) -> Tuple[str, ...]:
+    """
+    Mengurutkan label dari yang terpanjang, di-cache per himpunan label.
+
+    Label terpanjang dicek lebih dulu agar label yang merupakan awalan label
+    lain (misal "TIDAK" dan "TIDAK RELEVAN") tetap tercocokkan dengan benar.
+    """
+    return tuple(sorted((label for label in labels if label), key=len, reverse=True))
+
+def _match_label_line(line: str, labels: Tuple[str, ...]) -> str | None:
+    r"""
+    Cek format "LABEL - justifikasi" tanpa regex (case-insensitive).
+
+    Setara dengan pola ^(LABEL)\s*-\s*.+ tetapi hanya memakai perbandingan
+    string, sehingga tidak ada backtracking pada baris yang panjang.
+
+    Returns:
+        str | None: Label (huruf besar, dari daftar yang diizinkan) yang cocok, atau None.
+    """
+    for label in labels:
+        if line[:len(label)].upper() != label:
+            continue
+        rest = line[len(label):].lstrip()
+        if len(rest) > 1 and rest[0] == '-':
+            return label
+    return None
+
 def parse_and_validate(
     raw_response: str | None,
     expected_count: int,
@@ -27,22 +60,30 @@ def parse_and_validate(
     # Buat set untuk pencocokan yang lebih cepat dan ubah ke huruf besar
     allowed_labels_set = {label.upper() for label in allowed_labels}
     
-    parsed_results = []
-    lines = raw_response.strip().split('\n')
+    # Parsing dan pembersihan dilakukan dalam satu kali lintasan
+    results = []
+    # Baris dibaca satu per satu dari StringIO (newline=None menangani \n, \r\n, dan \r),
+    # sehingga baris setelah jumlah yang diminta tercapai tidak pernah dibuat sebagai string
+    lines = io.StringIO(raw_response, newline=None)
+    total_lines = raw_response.count('\n') + 1
     
     # Log total baris yang akan diproses
-    logging.info(f"Total baris dalam raw response: {len(lines)}, Expected: {expected_count}")
+    logging.info(f"Total baris dalam raw response: {total_lines}, Expected: {expected_count}")
 
-    # Buat Regex secara dinamis dari daftar label yang diizinkan
-    # re.escape() digunakan untuk menangani label yang mungkin memiliki karakter khusus
-    label_pattern = "|".join(re.escape(label) for label in allowed_labels_set)
-    valid_line_regex = re.compile(rf"^({label_pattern})\s*-\s*.+", re.IGNORECASE)
+    # Label yang diizinkan, terpanjang lebih dulu (diambil dari cache jika sudah pernah dibuat)
+    label_prefixes = _label_prefixes(frozenset(allowed_labels_set))
+    # Huruf awal setiap label, untuk melewati pengecekan pada baris yang pasti tidak cocok
+    label_initials = {label[0] for label in label_prefixes}
+    # Nomor baris yang tidak cocok dikumpulkan lalu dilaporkan sekali setelah loop
+    unmatched_line_nums = []
+    # Log per baris hanya diformat jika level DEBUG memang aktif
+    debug_on = logging.getLogger().isEnabledFor(logging.DEBUG)
 
     for line_num, line in enumerate(lines, 1):
         # HENTIKAN PARSING JIKA SUDAH MENCAPAI JUMLAH YANG DIMINTA
-        if len(parsed_results) >= expected_count:
+        if len(results) >= expected_count:
             logging.info(f"✓ Telah mengumpulkan {expected_count} baris valid. Menghentikan parsing pada baris ke-{line_num}.")
-            logging.info(f"Sisa {len(lines) - line_num + 1} baris diabaikan.")
+            logging.info(f"Sisa {total_lines - line_num + 1} baris diabaikan.")
             break
 
         line = line.strip()
@@ -50,68 +91,56 @@ def parse_and_validate(
             continue
 
         # Log setiap baris yang sedang diproses
-        logging.debug(f"Memproses baris {line_num}: '{line[:100]}{'...' if len(line) > 100 else ''}'")
-        
-        # Cek apakah baris mengandung tag HTML
-        html_tags = re.findall(r'<.*?>', line)
-        if html_tags:
-            logging.info(f"Baris {line_num} mengandung tag HTML: {html_tags}")
-
-        if valid_line_regex.match(line):
-            try:
-                parts = line.split(' - ', 1)
-                label = parts[0].strip().upper()
-                # Pengecekan kedua untuk memastikan label ada di set kita
-                if label in allowed_labels_set:
-                    justification = parts[1].strip()
-                    parsed_results.append((label, justification))
-                    logging.debug(f"✓ Baris {line_num} berhasil di-parse: {label}")
-                else:
-                    # Seharusnya jarang terjadi karena regex, tapi sebagai pengaman
-                    logging.warning(f"Mengabaikan baris {line_num} karena label '{label}' tidak ada di daftar yang diizinkan.")
-            except IndexError:
-                logging.warning(f"Mengabaikan baris {line_num} karena format tidak valid (tidak ada ' - ').")
+        if debug_on:
+            logging.debug("Memproses baris %d: '%s%s'", line_num, line[:100], '...' if len(line) > 100 else '')
+
+        label = _match_label_line(line, label_prefixes) if line[0].upper() in label_initials else None
+        if label:
+            # partition() mencari pemisah dan memecah baris dalam satu kali pemindaian
+            label_part, separator, justification = line.partition(' - ')
+            justification = justification.strip()
+            # Label sudah dinormalisasi oleh _match_label_line; cukup pastikan teks sebelum
+            # ' - ' memang hanya label itu (bukan misalnya "POSITIF-X - ...")
+            if not separator:
+                problem = "format tidak valid (tidak ada ' - ')"
+            elif len(label_part.rstrip()) != len(label):
+                problem = f"label '{label_part.strip().upper()}' tidak ada di daftar yang diizinkan"
+            # Validasi justifikasi tidak kosong dan tidak terlalu pendek
+            elif len(justification) < 3:
+                problem = f"justifikasi kosong atau terlalu pendek: '{justification}'"
+            else:
+                results.append({"label": label, "justification": justification})
+                if debug_on:
+                    logging.debug("✓ Baris %d berhasil di-parse: %s", line_num, label)
                 continue
+        elif line[-1] == '-' and line[:-1].rstrip().upper() in allowed_labels_set:
+            # "LABEL -" tanpa justifikasi (spasi setelah '-' sudah terpotong oleh strip())
+            problem = "justifikasi kosong"
         else:
-            logging.debug(f"Baris {line_num} tidak cocok dengan format yang diharapkan, melanjutkan ke baris berikutnya.")
-
-    # -- VALIDASI AKHIR DAN PEMBERSIHAN --
-    logging.info(f"Melakukan pengecekan ulang terhadap {len(parsed_results)} hasil parsing...")
-    
-    # Pengecekan ulang format dan pembersihan
-    cleaned_results = []
-    for i, (label, justification) in enumerate(parsed_results):
-        # Validasi format ulang
-        if not label or not justification:
-            logging.warning(f"Membuang hasil ke-{i+1}: label atau justifikasi kosong")
-            continue
-            
-        # Validasi label masih ada di allowed_labels_set
-        if label.upper() not in allowed_labels_set:
-            logging.warning(f"Membuang hasil ke-{i+1}: label '{label}' tidak valid")
+            unmatched_line_nums.append(line_num)
+            # Cek tag HTML hanya pada baris yang gagal dicocokkan (kemungkinan penyebabnya)
+            if '<' in line:
+                html_tags = _HTML_TAG_RE.findall(line)
+                if html_tags:
+                    logging.info(f"Baris {line_num} mengandung tag HTML: {html_tags}")
             continue
-            
-        # Validasi justifikasi tidak terlalu pendek
-        if len(justification.strip()) < 3:
-            logging.warning(f"Membuang hasil ke-{i+1}: justifikasi terlalu pendek: '{justification}'")
-            continue
-            
-        cleaned_results.append((label, justification))
-        
-        # HENTIKAN JIKA SUDAH MENCAPAI JUMLAH YANG DIINGINKAN
-        if len(cleaned_results) >= expected_count:
-            logging.info(f"✓ Telah mengumpulkan {expected_count} hasil valid. Membuang {len(parsed_results) - i - 1} sisanya.")
-            break
-    
+
+        # Baris ini adalah jawaban untuk satu teks input. Melewatinya akan menggeser label
+        # baris-baris berikutnya ke teks yang salah, jadi seluruh batch ditolak dan dicoba ulang.
+        error_msg = f"Validasi Gagal: Baris {line_num} tidak valid ({problem}); batch ditolak agar label tidak bergeser."
+        logging.warning(error_msg)
+        return False, error_msg
+
+    if unmatched_line_nums:
+        logging.debug(f"{len(unmatched_line_nums)} baris tidak cocok dengan format yang diharapkan (baris: {unmatched_line_nums[:10]}).")
+
+    # -- VALIDASI AKHIR --
     # Pengecekan jumlah akhir
-    if len(cleaned_results) != expected_count:
-        error_msg = f"Validasi Gagal: Setelah pembersihan, jumlah hasil valid ({len(cleaned_results)}) tidak sesuai dengan input ({expected_count})."
+    if len(results) != expected_count:
+        error_msg = f"Validasi Gagal: Setelah pembersihan, jumlah hasil valid ({len(results)}) tidak sesuai dengan input ({expected_count})."
         logging.warning(error_msg)
-        logging.info(f"Hasil yang berhasil dibersihkan: {len(cleaned_results)}/{len(parsed_results)}")
         return False, error_msg
 
-    structured_results = [{"label": r[0], "justification": r[1]} for r in cleaned_results]
-    logging.info(f"✓ Validasi berhasil untuk {len(structured_results)} baris setelah pembersihan.")
-    logging.info(f"Rasio pembersihan: {len(cleaned_results)}/{len(parsed_results)} hasil dipertahankan.")
+    logging.info(f"✓ Validasi berhasil untuk {len(results)} baris setelah pembersihan.")
     
-    return True, structured_results
\ No newline at end of file
+    return True, results
@@ -1,8 +1,15 @@
 import argparse
+import itertools
 import logging
+import queue
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import time
 from datetime import datetime
+from typing import List
 
 # Impor komponen inti dari folder core_logic
 # Pastikan Anda sudah memindahkan dan merefaktor file-file ini
@@ -73,6 +80,122 @@ def load_prompt(prompt_filepath: Path) -> str | None:
         logging.error(f"Error decoding file {prompt_filepath}: {e}", exc_info=True)
         return None
 
+MAX_RETRIES = 3
+
+def label_batch(browser, batch_data, batch_number: int, expected_count: int,
+                prompt_template: str, allowed_labels_list: List[str], session_log_path: Path) -> List[dict] | None:
+    """
+    Mengirim satu batch ke Aistudio dan memvalidasi responsnya, dengan percobaan ulang.
+    Mengembalikan hasil yang valid, atau None jika semua percobaan gagal.
+    """
+    # Prompt is identical for every retry of this batch, so build it once.
+    # DataHandler already yields "" for missing texts, so str() never produces "<NA>" here.
+    full_prompt = prompt_template + '\n\n"' + '"\n"'.join(map(str, batch_data)) + '"'
+
+    for attempt in range(MAX_RETRIES):
+        logging.info(f"Attempt #{attempt + 1}/{MAX_RETRIES} for batch #{batch_number}...")
+        
+        raw_response = browser.get_raw_response_for_batch(full_prompt)
+        is_valid, result = parse_and_validate(
+            raw_response, 
+            expected_count=expected_count, 
+            allowed_labels=allowed_labels_list
+        )
+
+        # Save check data artifacts for each attempt
+        check_data_path = session_log_path / f"check_data_batch_{batch_number}_attempt_{attempt+1}.txt"
+        with open(check_data_path, "w", encoding="utf-8", errors="replace") as f:
+            f.write(f"--- VALIDATION ---\nValid: {is_valid}\nResult/Error: {result}\n\n")
+            f.write(f"--- RAW RESPONSE ---\n{raw_response or 'NO RESPONSE EXTRACTED'}\n\n")
+            f.write(f"--- FULL PROMPT ---\n{full_prompt}\n\n")
+
+        if is_valid:
+            logging.info(f"Batch #{batch_number} successfully validated on attempt #{attempt + 1}.")
+            return result
+        logging.warning(f"Validation failed: {result}. Retrying in 5 seconds...")
+        browser.clear_chat_history()
+        time.sleep(5)
+    return None
+
+def prepare_worker_profiles(base_dir: str, workers: int) -> List[str]:
+    """
+    Menyiapkan satu direktori profil browser per worker. Chromium mengunci profil yang sedang
+    dipakai, jadi setiap worker butuh salinan sendiri dari profil yang sudah login.
+    Salinan yang sudah ada dipakai ulang.
+    """
+    base_path = Path(base_dir)
+    profiles = []
+    for worker_id in range(workers):
+        target = Path(f"{base_dir}_w{worker_id}")
+        if not target.exists():
+            if base_path.is_dir():
+                logging.info(f"Menyalin profil browser '{base_path}' ke '{target}' untuk worker {worker_id}...")
+                shutil.copytree(base_path, target, ignore=shutil.ignore_patterns('Singleton*', '*.lock'))
+            else:
+                logging.warning(f"Profil '{base_path}' belum ada; worker {worker_id} mulai dengan profil kosong dan perlu login.")
+        profiles.append(str(target))
+    return profiles
+
+def run_parallel_batches(jobs: "queue.Queue", worker_profiles: List[str], session_log_path: Path,
+                         aistudio_url: str, prompt_template: str, allowed_labels_list: List[str],
+                         record_batch_result):
+    """
+    Memproses batch dari antrean dengan beberapa browser sekaligus. Setiap worker membuat
+    Automation-nya sendiri di thread-nya (objek Playwright sync terikat ke thread pembuatnya)
+    lalu mengambil batch berikutnya dari antrean hingga habis.
+    """
+    stop_event = threading.Event()
+
+    def worker(worker_id: int, user_data_dir: str):
+        worker_log_path = session_log_path / f"worker_{worker_id}"
+        worker_log_path.mkdir(parents=True, exist_ok=True)
+        automation = Automation(user_data_dir=user_data_dir, log_folder=worker_log_path, prewarm_url=aistudio_url)
+        try:
+            automation.start_session(aistudio_url)
+            while not stop_event.is_set():
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                i, start_index, batch_data, expected_count = job
+                logging.info(f"[Worker {worker_id}] Memproses batch #{i + 1}")
+                try:
+                    validated_results = label_batch(
+                        automation, batch_data, i + 1, expected_count,
+                        prompt_template, allowed_labels_list, worker_log_path
+                    )
+                except Exception:
+                    # Kembalikan batch ke antrean agar dikerjakan worker lain (atau dicatat
+                    # gagal di akhir) sebelum worker ini berhenti
+                    jobs.put(job)
+                    raise
+                record_batch_result(i + 1, start_index, batch_data, validated_results)
+        finally:
+            automation.close_session()
+
+    logging.info(f"Menjalankan {len(worker_profiles)} worker browser paralel...")
+    with ThreadPoolExecutor(max_workers=len(worker_profiles)) as executor:
+        futures = {executor.submit(worker, wid, profile): wid for wid, profile in enumerate(worker_profiles)}
+        try:
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    # Batch yang sedang dikerjakan worker ini sudah dikembalikan ke antrean
+                    logging.error(f"Worker {futures[future]} berhenti karena error: {e}", exc_info=True)
+        except KeyboardInterrupt:
+            stop_event.set()
+            raise
+
+    if not jobs.empty():
+        logging.warning(f"{jobs.qsize()} batch tidak terproses karena semua worker berhenti. Mencatatnya sebagai baris gagal.")
+        while True:
+            try:
+                i, start_index, batch_data, _ = jobs.get_nowait()
+            except queue.Empty:
+                break
+            record_batch_result(i + 1, start_index, batch_data, None)
+
 def main(args):
     """
     Main orchestrator function for auto-labeling process with metrics tracking.
@@ -90,12 +213,58 @@ def main(args):
     batch_count = 0
     allowed_labels_list = [label.strip().upper() for label in args.allowed_labels.split(',')]
     logging.info(f"Using allowed labels for validation: {allowed_labels_list}")
+    workers = max(1, getattr(args, 'workers', 1) or 1)
+    cdp_endpoint = getattr(args, 'cdp_endpoint', None)
+    if workers > 1 and cdp_endpoint:
+        logging.warning("--workers diabaikan saat memakai --cdp-endpoint; batch diproses berurutan.")
+        workers = 1
+    pending_jobs = queue.Queue()
+    worker_profiles = []
+    # Dipanggil dari thread worker saat paralel; DataHandler, FailedRowHandler, dan
+    # metrics tracker tidak thread-safe sehingga semua penulisan lewat lock ini.
+    result_lock = threading.Lock()
+
+    def record_batch_result(batch_number, start_index, batch_data, validated_results):
+        """Menyimpan hasil satu batch atau mencatat barisnya sebagai gagal."""
+        nonlocal total_processed_rows, total_failed_rows, batch_count
+        with result_lock:
+            if validated_results:
+                # Posisi batch dalam daftar baris belum diproses, tidak bergeser oleh batch yang gagal
+                data_handler.update_and_save_data(validated_results, start_index=start_index)
+                total_processed_rows += len(validated_results)
+                batch_count += 1
+                logging.info(f"Progress saved. Total valid processed rows: {total_processed_rows}")
+            else:
+                logging.error(f"Failed to process Batch #{batch_number} after {MAX_RETRIES} attempts. Recording rows as failed.")
+                for text in batch_data:
+                    failed_handler.add_failed_row(
+                        original_text=text, invalid_label="N/A", justification="N/A",
+                        reason=f"Failed validation after {MAX_RETRIES} attempts."
+                    )
+                    total_failed_rows += 1
+
+            # Update metrics progress
+            if metrics_tracker:
+                metrics_tracker.update_progress(
+                    processed_rows=total_processed_rows,
+                    failed_rows=total_failed_rows,
+                    batch_count=batch_count
+                )
 
     try:
         # Inisialisasi handler
         data_handler = DataHandler(input_filepath=args.input_file, output_dir=getattr(args, 'output_dir', None))
         failed_handler = FailedRowHandler(log_folder=session_log_path, source_filename_stem=args.input_file.stem)
-        browser = Automation(user_data_dir="browser_data", log_folder=session_log_path)
+        # Mulai memuat Aistudio sejak awal agar waktu muatnya tumpang tindih dengan persiapan data
+        aistudio_url = "https://aistudio.google.com/"
+        if cdp_endpoint:
+            # Pakai browser milik daemon (--daemon) yang sudah login, tanpa peluncuran baru
+            browser = Automation.from_cdp(cdp_endpoint, log_folder=session_log_path, prewarm_url=aistudio_url)
+        elif workers > 1:
+            # Setiap worker meluncurkan browser sendiri di thread-nya dari salinan profil
+            worker_profiles = prepare_worker_profiles("browser_data", workers)
+        else:
+            browser = Automation(user_data_dir="browser_data", log_folder=session_log_path, prewarm_url=aistudio_url)
         
         # Initialize metrics tracker
         metrics_tracker = ExecutionMetricsTracker()
@@ -119,7 +288,8 @@ def main(args):
 
         try:
             # Move start_session into its own try block
-            browser.start_session("https://aistudio.google.com/")
+            if browser:
+                browser.start_session(aistudio_url)
         except TimeoutError as e:
             # Catch specific error from start_session and end cleanly
             logging.critical(f"Failed to start browser session due to timeout. Stopping process. Details: {e}")
@@ -129,13 +299,13 @@ def main(args):
             return # Exit main function safely
 
         # Get and process batches
-        batches = data_handler.get_data_batches(batch_size=args.batch_size)
-        total_batches = len(batches)
-        total_unprocessed_rows = data_handler.get_unprocessed_data_count()
+        total_unprocessed_rows = total_rows
+        total_batches = -(-total_unprocessed_rows // args.batch_size)
+        batches = data_handler.iter_data_batches(batch_size=args.batch_size)
         
         if args.debug:
             logging.warning("DEBUG MODE ACTIVE: Will only process 1 batch.")
-            batches = batches[:1]
+            batches = itertools.islice(batches, 1)
 
         for i, batch_data in enumerate(batches):
             # Hitung expected_count secara dinamis untuk batch terakhir
@@ -143,67 +313,24 @@ def main(args):
             remaining_rows = total_unprocessed_rows - rows_processed_so_far
             expected_count = min(len(batch_data), remaining_rows)
             
+            if workers > 1:
+                # Dikerjakan oleh worker paralel setelah semua batch dikumpulkan
+                pending_jobs.put((i, rows_processed_so_far, batch_data, expected_count))
+                continue
+
             logging.info(f"--- Processing Batch {i + 1}/{total_batches} (Size: {len(batch_data)} rows, Expected: {expected_count}) ---")
             
-            MAX_RETRIES = 3
-            validated_results = None
-            for attempt in range(MAX_RETRIES):
-                logging.info(f"Attempt #{attempt + 1}/{MAX_RETRIES} for this batch...")
-                
-                full_prompt = f"{prompt_template}\n\n" + "\n".join(f'"{text}"' for text in batch_data)
-                raw_response = browser.get_raw_response_for_batch(full_prompt)
-                is_valid, result = parse_and_validate(
-                    raw_response, 
-                    expected_count=expected_count, 
-                    allowed_labels=allowed_labels_list
-                )
-
-                # Save check data artifacts for each attempt
-                check_data_path = session_log_path / f"check_data_batch_{i+1}_attempt_{attempt+1}.txt"
-                with open(check_data_path, "w", encoding="utf-8", errors="replace") as f:
-                    f.write(f"--- VALIDATION ---\nValid: {is_valid}\nResult/Error: {result}\n\n")
-                    f.write(f"--- RAW RESPONSE ---\n{raw_response or 'NO RESPONSE EXTRACTED'}\n\n")
-                    f.write(f"--- FULL PROMPT ---\n{full_prompt}\n\n")
+            validated_results = label_batch(
+                browser, batch_data, i + 1, expected_count,
+                prompt_template, allowed_labels_list, session_log_path
+            )
+            record_batch_result(i + 1, rows_processed_so_far, batch_data, validated_results)
 
-                if is_valid:
-                    logging.info(f"Batch #{i + 1} successfully validated on attempt #{attempt + 1}.")
-                    validated_results = result
-                    break # Exit retry loop if successful
-                else:
-                    logging.warning(f"Validation failed: {result}. Retrying in 5 seconds...")
-                    browser.clear_chat_history()
-                    time.sleep(5)
-
-            # Save results or record failure
-            if validated_results:
-                data_handler.update_and_save_data(validated_results, start_index=total_processed_rows)
-                total_processed_rows += len(validated_results)
-                batch_count += 1
-                logging.info(f"Progress saved. Total valid processed rows: {total_processed_rows}")
-                
-                # Update metrics progress
-                if metrics_tracker:
-                    metrics_tracker.update_progress(
-                        processed_rows=total_processed_rows,
-                        failed_rows=total_failed_rows,
-                        batch_count=batch_count
-                    )
-            else:
-                logging.error(f"Failed to process Batch #{i + 1} after {MAX_RETRIES} attempts. Recording rows as failed.")
-                for text in batch_data:
-                    failed_handler.add_failed_row(
-                        original_text=text, invalid_label="N/A", justification="N/A",
-                        reason=f"Failed validation after {MAX_RETRIES} attempts."
-                    )
-                    total_failed_rows += 1
-                
-                # Update metrics with failed rows
-                if metrics_tracker:
-                    metrics_tracker.update_progress(
-                        processed_rows=total_processed_rows,
-                        failed_rows=total_failed_rows,
-                        batch_count=batch_count
-                    )
+        if workers > 1:
+            run_parallel_batches(
+                pending_jobs, worker_profiles, session_log_path, aistudio_url,
+                prompt_template, allowed_labels_list, record_batch_result
+            )
     
     except KeyboardInterrupt:
         logging.warning("Process interrupted by user (Ctrl+C).")
@@ -226,7 +353,9 @@ def main(args):
             browser.close_session()
         if failed_handler:
             failed_handler.save_to_file()
-        if data_handler and total_processed_rows > 0:
+        # Baris yang dipulihkan dari checkpoint juga harus ditulis, meskipun run ini
+        # tidak memproses baris baru (mis. proses mati setelah batch terakhir).
+        if data_handler and (total_processed_rows > 0 or data_handler.restored_row_count):
             data_handler.save_final_results()
         
         # End metrics tracking session if still active
@@ -239,13 +368,36 @@ def main(args):
         
         logging.info("--- Auto-labeling process finished ---")
 
+def run_browser_daemon(port: int):
+    """
+    Meluncurkan browser sekali dengan endpoint CDP terbuka lalu menunggu hingga stdin ditutup
+    (Enter/Ctrl+D). Selama daemon hidup, run labeling dengan --cdp-endpoint memakai browser
+    yang sama sehingga tidak perlu peluncuran dan pengecekan login ulang.
+    """
+    session_log_path = setup_logging_session()
+    aistudio_url = "https://aistudio.google.com/"
+    browser = Automation(
+        user_data_dir="browser_data", log_folder=session_log_path,
+        prewarm_url=aistudio_url, remote_debugging_port=port
+    )
+    try:
+        browser.start_session(aistudio_url)
+        logging.info(f"Browser daemon siap. Jalankan labeling dengan --cdp-endpoint http://localhost:{port}")
+        logging.info("Tekan Enter untuk menghentikan daemon.")
+        sys.stdin.readline()
+    except KeyboardInterrupt:
+        logging.warning("Daemon dihentikan oleh pengguna (Ctrl+C).")
+    finally:
+        browser.close_session()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Aplikasi Auto-Labeling menggunakan Aistudio.")
-    parser.add_argument("--input-file", type=Path, required=True, help="Path ke file dataset (.csv atau .xlsx).")
+    parser.add_argument("--input-file", type=Path, help="Path ke file dataset (.csv atau .xlsx). Wajib kecuali --daemon.")
     parser.add_argument("--prompt-file", type=Path, default=Path("prompts/prompt.txt"), help="Path ke file prompt teks.")
     parser.add_argument("--batch-size", type=int, default=50, help="Jumlah baris yang diproses per batch.")
     parser.add_argument("--debug", action="store_true", help="Jalankan dalam mode debug (hanya proses satu batch).")
     parser.add_argument("--output-dir", type=Path, help="Direktori output khusus untuk menyimpan hasil (opsional).")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah browser paralel; tiap worker memakai salinan profil browser_data sendiri.")
     parser.add_argument(
         "--allowed-labels", 
         type=str, 
@@ -253,6 +405,15 @@ if __name__ == "__main__":
         help="Daftar label yang valid, dipisahkan koma."
     )
     
+    parser.add_argument("--daemon", action="store_true", help="Luncurkan browser bersama dengan endpoint CDP dan tunggu hingga dihentikan.")
+    parser.add_argument("--daemon-port", type=int, default=9222, help="Port CDP untuk --daemon.")
+    parser.add_argument("--cdp-endpoint", type=str, help="Endpoint CDP browser daemon yang dipakai ulang (mis. http://localhost:9222).")
+    
     args = parser.parse_args()
     
-    main(args)
\ No newline at end of file
+    if args.daemon:
+        run_browser_daemon(args.daemon_port)
+    else:
+        if args.input_file is None:
+            parser.error("--input-file wajib diisi kecuali menggunakan --daemon.")
+        main(args)
\ No newline at end of file
@@ -1,4 +1,5 @@
 # tests/test_browser_automation.py
+import json
 import sys
 from pathlib import Path
 import pytest
@@ -6,6 +7,8 @@ import tempfile
 import shutil
 from unittest.mock import patch, Mock, MagicMock, call
 
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from src.core_logic.browser_automation import Automation
 
@@ -61,6 +64,56 @@ class TestBrowserAutomation:
         # Verify page setup
         mock_page.set_default_timeout.assert_called_once_with(60000)
     
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_slow_mo_disabled_by_default(self, mock_sync_playwright):
+        """Test browser diluncurkan tanpa slow_mo kecuali diminta"""
+        mock_playwright, _, _, _ = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        Automation(self.user_data_dir, self.log_folder)
+        assert mock_playwright.chromium.launch_persistent_context.call_args[1]['slow_mo'] == 0
+        
+        Automation(self.user_data_dir, self.log_folder, slow_mo=150)
+        assert mock_playwright.chromium.launch_persistent_context.call_args[1]['slow_mo'] == 150
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_prewarm_url_starts_navigation(self, mock_sync_playwright):
+        """Test prewarm_url memulai navigasi tanpa menunggu halaman selesai dimuat"""
+        mock_playwright, _, _, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        Automation(self.user_data_dir, self.log_folder)
+        mock_page.goto.assert_not_called()
+        
+        Automation(self.user_data_dir, self.log_folder, prewarm_url="https://aistudio.google.com/")
+        mock_page.goto.assert_called_once_with("https://aistudio.google.com/", wait_until="commit", timeout=90000)
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_block_resources(self, mock_sync_playwright):
+        """Test block_resources membatalkan gambar/font/media dan meneruskan request lain"""
+        mock_playwright, _, mock_context, _ = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        Automation(self.user_data_dir, self.log_folder)
+        mock_context.route.assert_not_called()
+        
+        Automation(self.user_data_dir, self.log_folder, block_resources=True)
+        mock_context.route.assert_called_once()
+        pattern, handler = mock_context.route.call_args[0]
+        assert pattern == "**/*"
+        
+        image_route = Mock()
+        image_route.request.resource_type = "image"
+        handler(image_route)
+        image_route.abort.assert_called_once()
+        image_route.continue_.assert_not_called()
+        
+        script_route = Mock()
+        script_route.request.resource_type = "script"
+        handler(script_route)
+        script_route.continue_.assert_called_once()
+        script_route.abort.assert_not_called()
+    
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_init_fallback_to_regular_browser(self, mock_sync_playwright):
         """Test fallback ke regular browser saat persistent context gagal"""
@@ -96,6 +149,49 @@ class TestBrowserAutomation:
         headless_call = mock_playwright.chromium.launch.call_args_list[1]
         assert headless_call[1]['headless'] == True
     
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_caches_successful_launch_strategy(self, mock_sync_playwright):
+        """Test fallback yang berhasil disimpan, tetapi konteks persisten tetap dicoba lebih dulu"""
+        mock_playwright, mock_browser, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        mock_playwright.chromium.launch_persistent_context.side_effect = Exception("Persistent failed")
+        
+        Automation(self.user_data_dir, self.log_folder)
+        
+        cache_file = Path(self.user_data_dir) / "_launch_strategy_cache.json"
+        assert json.loads(cache_file.read_text())["strategy"] == "regular"
+        
+        # Next launch still tries the logged-in persistent profile first
+        mock_playwright.chromium.launch_persistent_context.reset_mock()
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        mock_playwright.chromium.launch_persistent_context.assert_called_once()
+        assert automation.browser == mock_browser
+        
+        # Once the persistent profile works again, the cached fallback is dropped
+        mock_playwright.chromium.launch_persistent_context.side_effect = None
+        mock_playwright.chromium.launch_persistent_context.return_value = mock_context
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        assert automation.context == mock_context
+        assert not cache_file.exists()
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_cached_fallback_is_tried_before_other_fallbacks(self, mock_sync_playwright):
+        """Test fallback tersimpan dicoba tepat setelah konteks persisten gagal"""
+        mock_playwright, mock_browser, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        mock_playwright.chromium.launch_persistent_context.side_effect = Exception("Profile locked")
+        cache_file = Path(self.user_data_dir) / "_launch_strategy_cache.json"
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"strategy": "headless"}))
+        
+        Automation(self.user_data_dir, self.log_folder)
+        
+        mock_playwright.chromium.launch_persistent_context.assert_called_once()
+        assert mock_playwright.chromium.launch.call_count == 1
+        assert mock_playwright.chromium.launch.call_args[1]['headless'] == True
+    
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_init_total_failure(self, mock_sync_playwright):
         """Test ketika semua metode browser launch gagal"""
@@ -116,13 +212,18 @@ class TestBrowserAutomation:
         mock_sync_playwright.return_value.start.return_value = mock_playwright
         
         automation = Automation(self.user_data_dir, self.log_folder)
-        automation._apply_stealth_techniques()
         
-        # Should call page.evaluate with stealth script
-        mock_page.evaluate.assert_called_once()
-        stealth_script = mock_page.evaluate.call_args[0][0]
-        assert "navigator.webdriver" in stealth_script
-        assert "window.chrome" in stealth_script
+        # Stealth script is registered on the context during __init__, before any navigation
+        scripts = [c[1]['script'] for c in mock_context.add_init_script.call_args_list]
+        stealth_scripts = [script for script in scripts if "navigator, 'webdriver'" in script]
+        assert len(stealth_scripts) == 1
+        assert "window.chrome" in stealth_scripts[0]
+        mock_page.evaluate.assert_not_called()
+        
+        # start_session no longer re-applies it through page.evaluate
+        mock_page.url = "https://example.com"
+        automation.start_session("https://aistudio.google.com/")
+        mock_page.evaluate.assert_not_called()
     
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_start_session_success(self, mock_sync_playwright):
@@ -133,7 +234,7 @@ class TestBrowserAutomation:
         # Mock page URL check
         mock_page.url = "https://example.com"
         
-        # Mock input locator
+        # Mock input locator (locators are cached during __init__)
         mock_locator = Mock()
         mock_page.locator.return_value = mock_locator
         
@@ -144,11 +245,42 @@ class TestBrowserAutomation:
         mock_page.goto.assert_called_once_with("https://aistudio.google.com/", wait_until="domcontentloaded", timeout=90000)
         
         # Should wait for input element
-        mock_page.locator.assert_called_with('ms-chunk-input textarea')
+        mock_page.locator.assert_any_call('ms-chunk-input textarea')
         mock_locator.wait_for.assert_called_once_with(state="visible", timeout=180000)
         
-        # Should take screenshot
-        mock_page.screenshot.assert_called()
+        # Debug screenshot is off by default
+        mock_page.screenshot.assert_not_called()
+    
+    @patch.dict('os.environ', {'DEBUG_SCREENSHOTS': '1'})
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_start_session_debug_screenshot(self, mock_sync_playwright):
+        """Test start_session mengambil screenshot saat DEBUG_SCREENSHOTS=1"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        mock_page.url = "https://aistudio.google.com/"
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        automation.start_session("https://aistudio.google.com/")
+        
+        # Already on the target host, so no navigation
+        mock_page.goto.assert_not_called()
+        mock_page.screenshot.assert_called_once_with(
+            path=f"{self.log_folder}/debug_session_start.jpg", type="jpeg", quality=60, full_page=False
+        )
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_error_screenshot_written_in_background(self, mock_sync_playwright):
+        """Test screenshot error diambil sebagai JPEG dan ditulis ke disk oleh thread latar"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        mock_page.screenshot.return_value = b"png-bytes"
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        automation._error_screenshot("ERROR_process_batch_attempt_1")
+        automation.close_session()  # flushes pending writes
+        
+        mock_page.screenshot.assert_called_once_with(type="png", full_page=False)
+        assert (Path(self.log_folder) / "ERROR_process_batch_attempt_1.png").read_bytes() == b"png-bytes"
     
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_start_session_timeout(self, mock_sync_playwright):
@@ -179,25 +311,81 @@ class TestBrowserAutomation:
         # Mock wait for generation and extract response
         automation._wait_for_generation_to_complete = Mock(return_value=True)
         automation._extract_response_text = Mock(return_value="POSITIF - Respons berhasil")
+        # First evaluate counts existing responses, second fills and clicks
+        mock_page.evaluate.side_effect = [[1, 0], "clicked"]
         
         result = automation.get_raw_response_for_batch("Test prompt")
         
-        # Should fill and click
-        mock_page.fill.assert_called_once_with('ms-chunk-input textarea', "Test prompt")
-        mock_page.click.assert_called_once_with('footer button[aria-label="Run"]')
-        
-        # Should wait and extract
-        automation._wait_for_generation_to_complete.assert_called_once()
-        automation._extract_response_text.assert_called_once()
+        # Should fill and click in a single evaluate round-trip
+        assert mock_page.evaluate.call_count == 2
+        assert mock_page.evaluate.call_args_list[0][0][1] == ['ms-message-content', 'div.model-response-text']
+        submit_args = mock_page.evaluate.call_args[0][1]
+        assert submit_args[:3] == [
+            'ms-chunk-input textarea', "Test prompt", 'footer button[aria-label="Run"]'
+        ]
+        # Human-like pause between filling and clicking Run, done in the browser
+        assert 50 <= submit_args[3] <= 200
+        automation._input_locator.fill.assert_not_called()
+        automation._send_button_locator.click.assert_not_called()
+        mock_page.fill.assert_not_called()
+        mock_page.click.assert_not_called()
+        
+        # Should wait for this batch's response container instead of sleeping
+        mock_page.locator.assert_any_call('ms-message-content')
+        mock_page.locator.return_value.nth.assert_any_call(1)
+        mock_page.locator.return_value.nth.return_value.wait_for.assert_called_with(state="attached", timeout=5000)
+        
+        # Should wait for responses added after the pre-submit count, then extract
+        automation._wait_for_generation_to_complete.assert_called_once_with([1, 0])
+        automation._extract_response_text.assert_called_once_with([1, 0])
         
         assert result == "POSITIF - Respons berhasil"
     
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_submit_prompt_falls_back_to_locators(self, mock_sync_playwright):
+        """Test _submit_prompt memakai locator jika tombol Run belum aktif atau textarea belum ada"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        locators = {}
+        mock_page.locator.side_effect = lambda selector: locators.setdefault(selector, Mock())
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        # Value set but Run still disabled -> locator click (auto-waits for enabled)
+        mock_page.evaluate.return_value = "filled"
+        automation._submit_prompt("Test prompt")
+        automation._input_locator.evaluate.assert_not_called()
+        automation._send_button_locator.click.assert_called_once_with()
+        
+        # Textarea not found -> fill through the locator, then click
+        mock_page.evaluate.return_value = "missing"
+        automation._submit_prompt("Test prompt")
+        assert automation._input_locator.evaluate.call_args[0][1] == "Test prompt"
+        assert automation._send_button_locator.click.call_count == 2
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_fast_fill_falls_back_to_fill(self, mock_sync_playwright):
+        """Test _fast_fill kembali ke fill() jika evaluate gagal"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        automation._input_locator.evaluate.side_effect = Exception("Element detached")
+        
+        automation._fast_fill("Test prompt")
+        
+        automation._input_locator.fill.assert_called_once_with("Test prompt")
+    
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_get_raw_response_for_batch_with_retries(self, mock_sync_playwright):
         """Test get_raw_response_for_batch dengan retry mechanism"""
         mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
         mock_sync_playwright.return_value.start.return_value = mock_playwright
         
+        # One distinct locator per selector so new-chat and Run clicks are counted separately
+        locators = {}
+        mock_page.locator.side_effect = lambda selector: locators.setdefault(selector, Mock())
+        
         automation = Automation(self.user_data_dir, self.log_folder)
         
         # Mock methods
@@ -207,11 +395,35 @@ class TestBrowserAutomation:
         with patch('time.sleep'):  # Mock sleep untuk speed up test
             result = automation.get_raw_response_for_batch("Test prompt")
         
-        # Should try 3 times
+        # Should try 3 times, starting a new chat (not reloading) before each retry
         assert automation._wait_for_generation_to_complete.call_count == 3
-        assert mock_page.reload.call_count == 2  # 2 retries
+        assert automation._new_chat_locator.click.call_count == 2  # 2 retries
+        assert automation._send_button_locator.click.call_count == 3
+        # Exponential backoff with jitter through Playwright's event loop
+        delays = [c[0][0] for c in mock_page.wait_for_timeout.call_args_list]
+        assert len(delays) == 2
+        assert 1000 <= delays[0] <= 3000
+        assert 2000 <= delays[1] <= 6000
+        mock_page.reload.assert_not_called()
         assert result == "POSITIF - Berhasil setelah retry"
     
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_get_raw_response_for_batch_raises_when_ui_unrecoverable(self, mock_sync_playwright):
+        """Test retry dihentikan jika kotak input hilang bahkan setelah reload"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        automation = Automation(self.user_data_dir, self.log_folder, max_retries=5, retry_base_delay=0)
+        automation._wait_for_generation_to_complete = Mock(return_value=False)
+        automation.clear_chat_history = Mock(side_effect=Exception("Input not found after reload"))
+        
+        with pytest.raises(Exception, match="Input not found after reload"):
+            automation.get_raw_response_for_batch("Test prompt")
+        
+        # Failed once, then gave up on the first retry instead of using all 5 attempts
+        assert automation._wait_for_generation_to_complete.call_count == 1
+        mock_page.wait_for_timeout.assert_called_once_with(0)
+    
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_get_raw_response_for_batch_all_retries_failed(self, mock_sync_playwright):
         """Test get_raw_response_for_batch ketika semua retry gagal"""
@@ -235,39 +447,80 @@ class TestBrowserAutomation:
         mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
         mock_sync_playwright.return_value.start.return_value = mock_playwright
         
-        automation = Automation(self.user_data_dir, self.log_folder)
-        
-        # Mock stop button behavior
+        # Mock stop button: appears, then detaches (locators are cached during __init__)
         mock_locator = Mock()
-        mock_locator.count.side_effect = [1, 1, 0]  # Initially present, then disappears
         mock_page.locator.return_value = mock_locator
         
-        with patch('time.time', side_effect=[0, 5, 10]), \
-             patch('time.sleep'):
-            result = automation._wait_for_generation_to_complete()
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        result = automation._wait_for_generation_to_complete()
         
         assert result == True
-        mock_page.locator.assert_called_with('button:has-text("Stop")')
+        mock_page.locator.assert_any_call('button:has-text("Stop")')
+        # Stop button is raced against the response container
+        race = mock_locator.or_.return_value.first
+        race.wait_for.assert_called_once_with(state="visible", timeout=30000)
+        assert mock_locator.wait_for.call_args_list[0][1]['state'] == "hidden"
+        mock_locator.count.assert_not_called()  # No manual polling
     
     @patch('src.core_logic.browser_automation.sync_playwright')
-    def test_wait_for_generation_to_complete_timeout(self, mock_sync_playwright):
-        """Test wait_for_generation_to_complete timeout"""
+    def test_wait_for_generation_ignores_previous_responses(self, mock_sync_playwright):
+        """Test penungguan hanya terpenuhi oleh kontainer respons yang muncul setelah prompt dikirim"""
         mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
         mock_sync_playwright.return_value.start.return_value = mock_playwright
+        locators = {}
+        mock_page.locator.side_effect = lambda selector: locators.setdefault(selector, Mock())
         
         automation = Automation(self.user_data_dir, self.log_folder)
         
+        assert automation._wait_for_generation_to_complete([3, 1]) == True
+        locators['ms-message-content'].nth.assert_called_once_with(3)
+        locators['div.model-response-text'].nth.assert_called_once_with(1)
+        new_response = locators['ms-message-content'].nth.return_value.or_.return_value
+        stop_button = locators['button:has-text("Stop")']
+        stop_button.or_.assert_called_once_with(new_response)
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_wait_for_generation_to_complete_timeout(self, mock_sync_playwright):
+        """Test wait_for_generation_to_complete timeout"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
         # Mock stop button to never disappear
         mock_locator = Mock()
-        mock_locator.count.return_value = 1  # Always present
+        mock_locator.wait_for.side_effect = PlaywrightTimeoutError("Timeout 240000ms exceeded")
         mock_page.locator.return_value = mock_locator
         
-        with patch('time.time', side_effect=range(0, 300, 5)), \
-             patch('time.sleep'):
-            result = automation._wait_for_generation_to_complete()
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        result = automation._wait_for_generation_to_complete()
         
         assert result == False
     
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_wait_for_generation_waits_for_response_text_without_stop(self, mock_sync_playwright):
+        """Test penungguan teks respons saat tombol 'Stop' dan kontainer tidak terdeteksi"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        mock_locator = Mock()
+        mock_locator.or_.return_value.first.wait_for.side_effect = PlaywrightTimeoutError("Timeout 30000ms exceeded")
+        mock_page.locator.return_value = mock_locator
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        # Response text shows up in a new container -> generation considered complete
+        assert automation._wait_for_generation_to_complete([2, 0]) == True
+        mock_page.wait_for_function.assert_called_once()
+        assert mock_page.wait_for_function.call_args[1]['arg'] == [
+            ['ms-message-content', 'div.model-response-text'],
+            [2, 0],
+        ]
+        
+        # Nothing ever shows up -> failure, so the caller retries
+        mock_page.wait_for_function.side_effect = PlaywrightTimeoutError("Timeout exceeded")
+        assert automation._wait_for_generation_to_complete() == False
+    
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_extract_response_text_with_container(self, mock_sync_playwright):
         """Test extract_response_text dengan container yang ditemukan"""
@@ -276,16 +529,46 @@ class TestBrowserAutomation:
         
         automation = Automation(self.user_data_dir, self.log_folder)
         
-        # Mock successful extraction
-        mock_element = Mock()
-        mock_element.evaluate.return_value = "POSITIF - Extracted text"
-        mock_page.query_selector.side_effect = [mock_element, None]  # First selector succeeds
+        # Mock successful extraction: container text includes preamble before the labels
+        mock_page.evaluate.return_value = [
+            {"selector": "ms-message-content", "index": 3,
+             "text": "Berikut hasilnya:\nPOSITIF - Extracted text\nNEGATIF - Second line"},
+        ]
         
-        result = automation._extract_response_text()
+        result = automation._extract_response_text([2, 0])
         
-        assert result == "POSITIF - Extracted text"
-        mock_page.query_selector.assert_called()
-        mock_element.evaluate.assert_called_once()
+        assert result == "POSITIF - Extracted text\nNEGATIF - Second line"
+        # All containers are read in a single evaluate call, only past the pre-submit counts
+        mock_page.evaluate.assert_called_once()
+        assert mock_page.evaluate.call_args[0][1] == [
+            ['ms-message-content', 'div.model-response-text'], [2, 0], True
+        ]
+        mock_page.query_selector.assert_not_called()
+        # textContent was enough, so no layout-forcing innerText read
+        mock_page.inner_text.assert_not_called()
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_extract_response_text_merged_text_content_uses_inner_text(self, mock_sync_playwright):
+        """Test fallback ke innerText jika textContent menggabungkan beberapa label dalam satu baris"""
+        mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
+        locators = {}
+        mock_page.locator.side_effect = lambda selector: locators.setdefault(selector, Mock())
+        mock_page.evaluate.return_value = [
+            {"selector": "ms-message-content", "index": 3, "text": "POSITIF - Bagus sekaliNEGATIF - Buruk"},
+        ]
+        response = locators.setdefault('ms-message-content', Mock()).nth.return_value
+        response.inner_text.return_value = "POSITIF - Bagus sekali\nNEGATIF - Buruk"
+        
+        result = automation._extract_response_text([3, 0])
+        
+        assert result == "POSITIF - Bagus sekali\nNEGATIF - Buruk"
+        # The same new container is re-read, not whatever ':last-of-type' matches first
+        locators['ms-message-content'].nth.assert_called_once_with(3)
+        response.inner_text.assert_called_once_with()
     
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_extract_response_text_fallback_to_body(self, mock_sync_playwright):
@@ -295,14 +578,19 @@ class TestBrowserAutomation:
         
         automation = Automation(self.user_data_dir, self.log_folder)
         
-        # Mock containers not found, but body succeeds
-        mock_body_element = Mock()
-        mock_body_element.evaluate.return_value = "POSITIF - Body extracted text"
-        mock_page.query_selector.side_effect = [None, None, mock_body_element]  # Only body succeeds
+        # Mock containers not found, but the last chat turn (or body) succeeds
+        mock_page.evaluate.side_effect = [[], "Menu\nPOSITIF - Body extracted text"]
         
-        result = automation._extract_response_text()
+        with patch('time.sleep') as mock_sleep:
+            result = automation._extract_response_text()
         
         assert result == "POSITIF - Body extracted text"
+        # DOM-stability wait instead of a fixed sleep
+        mock_sleep.assert_not_called()
+        assert mock_page.wait_for_function.call_args[1]['polling'] == 100
+        assert mock_page.evaluate.call_count == 2
+        assert mock_page.evaluate.call_args[0][1] == ['ms-chat-turn:last-of-type', 'body']
+        mock_page.inner_text.assert_not_called()
     
     @patch('src.core_logic.browser_automation.sync_playwright')
     def test_extract_response_text_all_methods_fail(self, mock_sync_playwright):
@@ -313,7 +601,7 @@ class TestBrowserAutomation:
         automation = Automation(self.user_data_dir, self.log_folder)
         
         # Mock all extractions fail
-        mock_page.query_selector.return_value = None
+        mock_page.evaluate.return_value = None
         
         result = automation._extract_response_text()
         
@@ -326,12 +614,12 @@ class TestBrowserAutomation:
         mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
         mock_sync_playwright.return_value.start.return_value = mock_playwright
         
-        automation = Automation(self.user_data_dir, self.log_folder)
-        
-        # Mock successful clear
+        # Mock successful clear (locators are cached during __init__)
         mock_locator = Mock()
         mock_page.locator.return_value = mock_locator
         
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
         with patch('time.sleep'):
             automation.clear_chat_history()
         
@@ -349,13 +637,13 @@ class TestBrowserAutomation:
         mock_playwright, _, mock_context, mock_page = self.create_mock_playwright()
         mock_sync_playwright.return_value.start.return_value = mock_playwright
         
-        automation = Automation(self.user_data_dir, self.log_folder)
-        
-        # Mock click to fail
+        # Mock click to fail (locators are cached during __init__)
         mock_locator = Mock()
         mock_locator.click.side_effect = Exception("Click failed")
         mock_page.locator.return_value = mock_locator
         
+        automation = Automation(self.user_data_dir, self.log_folder)
+        
         with patch('time.sleep'):
             automation.clear_chat_history()
         
@@ -395,6 +683,38 @@ class TestBrowserAutomation:
         
         # Playwright stop should still be called
         mock_playwright.stop.assert_called_once()
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_from_cdp_attaches_and_leaves_browser_running(self, mock_sync_playwright):
+        """Test from_cdp memakai konteks browser daemon dan tidak menutupnya saat selesai"""
+        mock_playwright, mock_browser, mock_context, mock_page = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        mock_playwright.chromium.connect_over_cdp.return_value = mock_browser
+        mock_browser.contexts = [mock_context]
+        
+        automation = Automation.from_cdp("http://localhost:9222", self.log_folder)
+        
+        mock_playwright.chromium.connect_over_cdp.assert_called_once_with("http://localhost:9222")
+        mock_playwright.chromium.launch_persistent_context.assert_not_called()
+        assert automation.context == mock_context
+        assert automation.page == mock_page
+        
+        automation.close_session()
+        mock_page.close.assert_called_once()
+        mock_context.close.assert_not_called()
+        mock_browser.close.assert_not_called()
+        mock_playwright.stop.assert_called_once()
+    
+    @patch('src.core_logic.browser_automation.sync_playwright')
+    def test_init_remote_debugging_port(self, mock_sync_playwright):
+        """Test remote_debugging_port membuka endpoint CDP pada browser yang diluncurkan"""
+        mock_playwright, _, _, _ = self.create_mock_playwright()
+        mock_sync_playwright.return_value.start.return_value = mock_playwright
+        
+        Automation(self.user_data_dir, self.log_folder, remote_debugging_port=9222)
+        
+        launch_args = mock_playwright.chromium.launch_persistent_context.call_args[1]['args']
+        assert "--remote-debugging-port=9222" in launch_args
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 import sys
 from pathlib import Path
 import pytest
+import numpy as np
 import pandas as pd
 import tempfile
 import shutil
@@ -67,6 +68,30 @@ class TestDataHandler:
         assert 'label' in handler.df.columns
         assert 'justification' in handler.df.columns
     
+    def test_init_excel_reuses_parse_cache(self):
+        """Test file Excel di-parse sekali lalu dibaca dari cache Parquet selama file tidak berubah"""
+        pytest.importorskip("pyarrow")
+        excel_path = self.create_sample_excel("test.xlsx")
+        output_dir = self.temp_dir / "output"
+        
+        first = DataHandler(excel_path, output_dir)
+        assert first._parse_cache_path.is_file()
+        # Cache lives in the tool's output folder, never next to the dataset
+        assert first._parse_cache_path.parent == output_dir / ".input_cache"
+        assert sorted(p.name for p in self.temp_dir.iterdir()) == ["output", "test.xlsx"]
+        
+        with patch('src.core_logic.data_handler.pd.read_excel') as mock_read_excel:
+            handler = DataHandler(excel_path, output_dir)
+        
+        mock_read_excel.assert_not_called()
+        assert len(handler.df) == 5
+        assert handler.get_unprocessed_data_count() == 3
+        
+        # A changed input no longer matches the cache and is parsed again
+        self.create_sample_excel("test.xlsx", dict(self.sample_data, label=[None] * 5))
+        changed = DataHandler(excel_path, output_dir)
+        assert changed.get_unprocessed_data_count() == 5
+    
     def test_init_with_csv_file(self):
         """Test inisialisasi dengan file CSV"""
         csv_path = self.create_sample_csv("test.csv")
@@ -106,6 +131,11 @@ class TestDataHandler:
         assert 'label' in handler.df.columns
         assert 'justification' in handler.df.columns
         
+        # Kolom teks memakai dtype string, bukan object
+        for column in ('full_text', 'label', 'justification'):
+            assert isinstance(handler.df[column].dtype, pd.StringDtype)
+        assert handler.df['label'].isna().all()
+        
         # Pastikan save_progress dipanggil karena ada perubahan
         mock_save.assert_called_once()
     
@@ -138,6 +168,30 @@ class TestDataHandler:
         assert batches[0][1] == 'Teks sampel 2'
         assert batches[1][0] == 'Teks sampel 3'
     
+    def test_iter_data_batches_yields_lazily(self):
+        """Test iter_data_batches menghasilkan potongan array satu per satu"""
+        excel_path = self.create_sample_excel("test.xlsx")
+        
+        with patch('pathlib.Path.mkdir'):
+            handler = DataHandler(excel_path)
+        
+        batches = handler.iter_data_batches(batch_size=2)
+        
+        first = next(batches)
+        assert isinstance(first, np.ndarray)
+        assert first.tolist() == ['Teks sampel 1', 'Teks sampel 2']
+        assert next(batches).tolist() == ['Teks sampel 3']
+        assert next(batches, None) is None
+    
+    def test_iter_data_batches_missing_text_is_empty_string(self):
+        """Test full_text kosong dikirim sebagai string kosong, bukan '<NA>'"""
+        data = dict(self.sample_data, full_text=['Teks sampel 1', None, 'Teks sampel 3', 'a', 'b'])
+        csv_path = self.create_sample_csv("test.csv", data)
+        
+        handler = DataHandler(csv_path, output_dir=self.temp_dir / "out")
+        
+        assert handler.get_data_batches(batch_size=3) == [['Teks sampel 1', '', 'Teks sampel 3']]
+    
     def test_get_data_batches_no_unprocessed(self):
         """Test get_data_batches ketika semua data sudah diproses"""
         # Semua data sudah memiliki label
@@ -195,6 +249,80 @@ class TestDataHandler:
         # save_progress harus dipanggil
         mock_save.assert_called_once()
     
+    def test_update_uses_batch_positions_after_earlier_updates(self):
+        """Test start_index tetap merujuk ke urutan batch meski batch sebelumnya sudah diperbarui"""
+        data = {
+            'full_text': [f'Teks {i}' for i in range(6)],
+            'label': [None, 'POSITIF', None, None, None, None],
+            'justification': [None, 'Sudah ada', None, None, None, None],
+        }
+        excel_path = self.create_sample_excel("positions.xlsx", data)
+        handler = DataHandler(excel_path, output_dir=self.temp_dir / "out")
+        
+        batches = handler.get_data_batches(batch_size=2)
+        assert batches == [['Teks 0', 'Teks 2'], ['Teks 3', 'Teks 4'], ['Teks 5']]
+        
+        # Batch 1 fails and is skipped; batch 3 then batch 2 succeed
+        handler.update_and_save_data([{"label": "NETRAL", "justification": "c"}], start_index=4)
+        handler.update_and_save_data(
+            [{"label": "NEGATIF", "justification": "a"}, {"label": "POSITIF", "justification": "b"}],
+            start_index=2,
+        )
+        
+        assert handler.df['label'].tolist()[3:] == ['NEGATIF', 'POSITIF', 'NETRAL']
+        # Rows of the failed batch stay unlabeled
+        assert pd.isna(handler.df.iloc[0]['label'])
+        assert pd.isna(handler.df.iloc[2]['label'])
+        assert handler.get_unprocessed_data_count() == 2
+    
+    def test_update_writes_checkpoint_and_resumes(self):
+        """Test checkpoint per batch dipakai untuk melanjutkan run yang terhenti"""
+        excel_path = self.create_sample_excel("test.xlsx")
+        output_dir = self.temp_dir / "out"
+        
+        handler = DataHandler(excel_path, output_dir=output_dir)
+        handler.update_and_save_data([{"label": "NETRAL", "justification": "Biasa saja"}], start_index=0)
+        
+        assert handler.checkpoint_path.exists()
+        # Input file is never modified
+        assert pd.isna(pd.read_excel(excel_path).iloc[0]['label'])
+        
+        # A new run on the same input picks up the checkpointed label
+        resumed = DataHandler(excel_path, output_dir=output_dir)
+        assert resumed.df.iloc[0]['label'] == 'NETRAL'
+        assert resumed.df.iloc[0]['justification'] == 'Biasa saja'
+        assert resumed.get_unprocessed_data_count() == 2
+        
+        assert resumed.restored_row_count == 1
+        
+        # Final results make the checkpoint obsolete
+        resumed.save_final_results()
+        assert not resumed.checkpoint_path.exists()
+    
+    def test_checkpoint_is_bound_to_input_file(self):
+        """Test checkpoint tidak dipakai untuk input lain bernama sama atau input yang sudah diubah"""
+        excel_path = self.create_sample_excel("test.xlsx")
+        output_dir = self.temp_dir / "out"
+        
+        handler = DataHandler(excel_path, output_dir=output_dir)
+        handler.update_and_save_data([{"label": "NETRAL", "justification": "Biasa saja"}], start_index=0)
+        
+        # Same stem in another folder gets its own checkpoint
+        (self.temp_dir / "other").mkdir()
+        other_path = self.temp_dir / "other" / "test.xlsx"
+        shutil.copy(excel_path, other_path)
+        other = DataHandler(other_path, output_dir=output_dir)
+        assert other.checkpoint_path != handler.checkpoint_path
+        assert pd.isna(other.df.iloc[0]['label'])
+        
+        # Editing the input invalidates its checkpoint
+        edited = dict(self.sample_data, full_text=['Teks baru'] + self.sample_data['full_text'][1:])
+        self.create_sample_excel("test.xlsx", edited)
+        resumed = DataHandler(excel_path, output_dir=output_dir)
+        assert pd.isna(resumed.df.iloc[0]['label'])
+        assert resumed.restored_row_count == 0
+        assert not resumed.checkpoint_path.exists()
+    
     def test_save_progress_excel(self):
         """Test save progress untuk file Excel"""
         excel_path = self.create_sample_excel("test.xlsx")
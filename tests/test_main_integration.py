@@ -18,12 +18,14 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 # Now safe to import
 try:
-    from src.main import main, setup_logging_session, load_prompt
+    from src.main import main, setup_logging_session, load_prompt, prepare_worker_profiles, run_parallel_batches
 except ImportError:
     # If still fails, create mock functions for testing
     main = Mock()
     setup_logging_session = Mock(return_value=Path("test_logs"))
     load_prompt = Mock(return_value="test prompt")
+    prepare_worker_profiles = Mock()
+    run_parallel_batches = Mock()
 
 
 class TestMainIntegration:
@@ -94,10 +96,10 @@ Format: LABEL - Justifikasi
         # Setup mocks
         mock_data_handler = Mock()
         mock_data_handler.get_unprocessed_data_count.return_value = 4
-        mock_data_handler.get_data_batches.return_value = [
+        mock_data_handler.iter_data_batches.return_value = iter([
             ['Produk ini sangat bagus', 'Pelayanan kurang memuaskan'],
             ['Harga sesuai dengan kualitas', 'Pengiriman cepat']
-        ]
+        ])
         mock_data_handler_class.return_value = mock_data_handler
         
         mock_failed_handler = Mock()
@@ -120,7 +122,7 @@ Format: LABEL - Justifikasi
         
         # Verify data handler calls
         mock_data_handler.get_unprocessed_data_count.assert_called_once()
-        mock_data_handler.get_data_batches.assert_called_once_with(batch_size=2)
+        mock_data_handler.iter_data_batches.assert_called_once_with(batch_size=2)
         mock_data_handler.update_and_save_data.assert_called()
         mock_data_handler.save_final_results.assert_called_once()
         
@@ -140,9 +142,9 @@ Format: LABEL - Justifikasi
         # Setup mocks
         mock_data_handler = Mock()
         mock_data_handler.get_unprocessed_data_count.return_value = 10
-        mock_data_handler.get_data_batches.return_value = [
+        mock_data_handler.iter_data_batches.return_value = iter([
             ['Batch 1'], ['Batch 2'], ['Batch 3']  # 3 batches available
-        ]
+        ])
         mock_data_handler_class.return_value = mock_data_handler
         
         mock_failed_handler = Mock()
@@ -171,7 +173,7 @@ Format: LABEL - Justifikasi
         # Setup mocks
         mock_data_handler = Mock()
         mock_data_handler.get_unprocessed_data_count.return_value = 2
-        mock_data_handler.get_data_batches.return_value = [['Test text 1', 'Test text 2']]
+        mock_data_handler.iter_data_batches.return_value = iter([['Test text 1', 'Test text 2']])
         mock_data_handler_class.return_value = mock_data_handler
         
         mock_failed_handler = Mock()
@@ -210,7 +212,7 @@ Format: LABEL - Justifikasi
         # Setup mocks
         mock_data_handler = Mock()
         mock_data_handler.get_unprocessed_data_count.return_value = 2
-        mock_data_handler.get_data_batches.return_value = [['Failed text 1', 'Failed text 2']]
+        mock_data_handler.iter_data_batches.return_value = iter([['Failed text 1', 'Failed text 2']])
         mock_data_handler_class.return_value = mock_data_handler
         
         mock_failed_handler = Mock()
@@ -251,6 +253,7 @@ Format: LABEL - Justifikasi
         # Setup mocks
         mock_data_handler = Mock()
         mock_data_handler.get_unprocessed_data_count.return_value = 0
+        mock_data_handler.restored_row_count = 0
         mock_data_handler_class.return_value = mock_data_handler
         
         with patch.object(Path, 'cwd', return_value=self.temp_dir):
@@ -259,7 +262,24 @@ Format: LABEL - Justifikasi
         
         # Should exit early without starting browser
         mock_automation_class.assert_not_called()
-        mock_data_handler.get_data_batches.assert_not_called()
+        mock_data_handler.iter_data_batches.assert_not_called()
+        mock_data_handler.save_final_results.assert_not_called()
+    
+    @patch('src.main.Automation')
+    @patch('src.main.DataHandler')
+    def test_main_writes_rows_restored_from_checkpoint(self, mock_data_handler_class, mock_automation_class):
+        """Test hasil dari checkpoint tetap disimpan walaupun tidak ada baris baru yang diproses"""
+        mock_data_handler = Mock()
+        mock_data_handler.get_unprocessed_data_count.return_value = 0
+        mock_data_handler.restored_row_count = 4
+        mock_data_handler_class.return_value = mock_data_handler
+        
+        with patch.object(Path, 'cwd', return_value=self.temp_dir):
+            args = self.create_mock_args()
+            main(args)
+        
+        mock_data_handler.iter_data_batches.assert_not_called()
+        mock_data_handler.save_final_results.assert_called_once()
     
     def test_main_browser_initialization_failure(self):
         """Test main ketika browser gagal diinisialisasi"""
@@ -288,7 +308,7 @@ Format: LABEL - Justifikasi
             # Setup mocks
             mock_data_handler = Mock()
             mock_data_handler.get_unprocessed_data_count.return_value = 5
-            mock_data_handler.get_data_batches.return_value = [['Test']]
+            mock_data_handler.iter_data_batches.return_value = iter([['Test']])
             mock_data_handler_class.return_value = mock_data_handler
             
             mock_automation = Mock()
@@ -302,6 +322,42 @@ Format: LABEL - Justifikasi
             # Should still do cleanup
             mock_automation.close_session.assert_called_once()
     
+    def test_prepare_worker_profiles_copies_base_profile(self):
+        """Test setiap worker mendapat salinan profil sendiri tanpa file lock Chromium"""
+        base_dir = self.temp_dir / "browser_data"
+        base_dir.mkdir()
+        (base_dir / "Cookies").write_text("session")
+        (base_dir / "SingletonLock").write_text("lock")
+        
+        profiles = prepare_worker_profiles(str(base_dir), 2)
+        
+        assert profiles == [f"{base_dir}_w0", f"{base_dir}_w1"]
+        for profile in profiles:
+            assert (Path(profile) / "Cookies").read_text() == "session"
+            assert not (Path(profile) / "SingletonLock").exists()
+    
+    @patch('src.main.label_batch')
+    @patch('src.main.Automation')
+    def test_run_parallel_batches_records_batches_of_crashed_worker(self, mock_automation_class, mock_label_batch):
+        """Test batch milik worker yang error tidak hilang, melainkan dicatat sebagai gagal"""
+        import queue
+        jobs = queue.Queue()
+        jobs.put((0, 0, ['Teks 1', 'Teks 2'], 2))
+        jobs.put((1, 2, ['Teks 3'], 1))
+        mock_label_batch.side_effect = RuntimeError("UI tidak bisa dipulihkan")
+        record_batch_result = Mock()
+        
+        run_parallel_batches(
+            jobs, ["profile_w0"], self.temp_dir, "https://aistudio.google.com/",
+            "prompt", ["POSITIF"], record_batch_result
+        )
+        
+        mock_label_batch.assert_called_once()
+        mock_automation_class.return_value.close_session.assert_called_once()
+        assert jobs.empty()
+        recorded = sorted(c.args for c in record_batch_result.call_args_list)
+        assert recorded == [(1, 0, ['Teks 1', 'Teks 2'], None), (2, 2, ['Teks 3'], None)]
+    
     def test_setup_logging_session(self):
         """Test setup_logging_session function"""
         with patch.object(Path, 'cwd', return_value=self.temp_dir):
@@ -4,7 +4,7 @@ from pathlib import Path
 import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from src.core_logic.validation import parse_and_validate
+from src.core_logic.validation import parse_and_validate, _label_prefixes
 
 class TestParseAndValidate:
     """Test suite untuk fungsi parse_and_validate"""
@@ -57,7 +57,7 @@ NEGATIF - Another extra line"""
         assert "Tidak ada respons" in result
     
     def test_cleanup_invalid_entries(self):
-        """Test pembersihan entri yang tidak valid"""
+        """Test baris berlabel yang tidak valid menolak seluruh batch"""
         raw_response = """POSITIF - Justifikasi valid
 NEGATIF - 
 NETRAL - Justifikasi yang cukup panjang
@@ -67,10 +67,17 @@ TIDAK RELEVAN - Justifikasi yang valid untuk completed"""
         expected_count = 3
         is_valid, result = parse_and_validate(raw_response, expected_count, self.allowed_labels)
         
-        # Setelah pembersihan, hanya ada 3 valid (yang kedua dan keempat dibuang)
-        assert is_valid == True
-        assert len(result) == 3
-        assert all(len(r["justification"]) >= 3 for r in result)
+        # Membuang baris kedua akan menggeser label berikutnya ke teks yang salah,
+        # jadi batch ditolak alih-alih membaca baris selanjutnya
+        assert is_valid == False
+        assert "Baris 2" in result
+        
+        # Justifikasi terlalu pendek pada baris berlabel juga menolak batch
+        is_valid, result = parse_and_validate(
+            "POSITIF - Justifikasi valid\nPOSITIF - ab\nNETRAL - Justifikasi panjang", 2, self.allowed_labels
+        )
+        assert is_valid == False
+        assert "terlalu pendek" in result
     
     def test_case_insensitive_labels(self):
         """Test bahwa parsing tidak case-sensitive"""
@@ -86,6 +93,31 @@ Netral - Label mixed case"""
         assert result[1]["label"] == "NEGATIF"
         assert result[2]["label"] == "NETRAL"
     
+    def test_non_label_lines_are_skipped(self):
+        """Test bahwa baris pengantar dan baris bernomor diabaikan"""
+        raw_response = """Berikut hasil klasifikasinya:
+1. POSITIF - Baris bernomor tidak termasuk format
+POSITIF - Komentar yang memuji produk
+- NEGATIF - Baris dengan awalan tanda hubung
+NEGATIF - Komentar yang mengeluhkan layanan"""
+
+        is_valid, result = parse_and_validate(raw_response, 2, self.allowed_labels)
+
+        assert is_valid == True
+        assert [r["label"] for r in result] == ["POSITIF", "NEGATIF"]
+        assert result[0]["justification"] == "Komentar yang memuji produk"
+
+    def test_label_that_prefixes_another_label(self):
+        """Test label yang merupakan awalan label lain tetap dikenali dengan benar"""
+        raw_response = """TIDAK RELEVAN - Komentar tentang topik lain
+TIDAK - Label pendek yang juga diizinkan
+TIDAKRELEVAN - Bukan label yang diizinkan"""
+
+        is_valid, result = parse_and_validate(raw_response, 2, ["TIDAK", "TIDAK RELEVAN"])
+
+        assert is_valid == True
+        assert [r["label"] for r in result] == ["TIDAK RELEVAN", "TIDAK"]
+
     def test_count_mismatch(self):
         """Test handling ketika jumlah hasil tidak sesuai expected_count"""
         raw_response = """POSITIF - Hanya ada satu
@@ -97,6 +129,16 @@ NEGATIF - Dan satu lagi"""
         assert is_valid == False
         assert "tidak sesuai dengan input" in result
     
+    def test_label_prefixes_are_cached_per_label_set(self):
+        """Test bahwa daftar label hanya disiapkan sekali untuk himpunan label yang sama"""
+        _label_prefixes.cache_clear()
+        parse_and_validate("POSITIF - Satu", 1, self.allowed_labels)
+        parse_and_validate("negatif - Dua", 1, [l.lower() for l in self.allowed_labels])
+
+        info = _label_prefixes.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
     def test_empty_allowed_labels(self):
         """Test handling ketika allowed_labels kosong"""
         raw_response = "POSITIF - Test"
@@ -28,10 +28,13 @@ class MockLocator:
     def __init__(self, page):
         self.page = page
     
-    def count(self):
-        """Mensimulasikan jumlah elemen. Tombol 'Stop' menghilang setelah 8 detik."""
-        elapsed = time.time() - self.page.start_time
-        return 0 if elapsed > 8 else 1
+    def wait_for(self, state, timeout):
+        """Mensimulasikan penungguan state. Tombol 'Stop' menghilang setelah 8 detik."""
+        if state == "hidden":
+            remaining = 8 - (time.time() - self.page.start_time)
+            if remaining * 1000 > timeout:
+                raise TimeoutError(f"Timeout {timeout}ms exceeded.")
+            time.sleep(max(0, remaining))
 
 # --- FUNGSI TES ---
 
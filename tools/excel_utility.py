@@ -11,7 +11,7 @@ import pandas as pd
 # Menambahkan blok try-except untuk impor agar memberikan pesan error yang lebih baik
 # jika struktur folder tidak benar.
 try:
-    from src.core_logic.data_handler import DataHandler
+    from src.core_logic.data_handler import DataHandler, read_excel, write_excel
 except ImportError:
     print("FATAL ERROR: Tidak dapat mengimpor DataHandler. Pastikan Anda menjalankan skrip ini sebagai modul dari direktori root proyek.")
     print("Contoh: python -m tools.excel_utility diagnose ...")
@@ -60,7 +60,7 @@ def diagnose_excel_file(filepath: str):
         
     try:
         logging.info("\n=== Mendiagnosis menggunakan pandas secara langsung ===")
-        df = pd.read_excel(filepath) if filepath.endswith('.xlsx') else pd.read_csv(filepath)
+        df = read_excel(filepath) if filepath.endswith('.xlsx') else pd.read_csv(filepath)
         logging.info(f"Berhasil dimuat dengan pandas. Bentuk (baris, kolom): {df.shape}")
         logging.info(f"Kolom: {', '.join(df.columns.tolist())}")
     except Exception as e:
@@ -84,10 +84,10 @@ def repair_excel_file(filepath: str):
     
     try:
         logging.info("Mencoba perbaikan dengan memuat ulang dan menyimpan kembali...")
-        df = pd.read_excel(filepath) if filepath.endswith('.xlsx') else pd.read_csv(filepath)
+        df = read_excel(filepath) if filepath.endswith('.xlsx') else pd.read_csv(filepath)
         
         if filepath.endswith('.xlsx'):
-            df.to_excel(filepath, index=False, engine='openpyxl')
+            write_excel(df, filepath)
         else:
             df.to_csv(filepath, index=False)
             
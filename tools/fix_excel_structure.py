@@ -10,6 +10,7 @@ import pandas as pd
 
 # Menambahkan blok try-except untuk impor agar memberikan pesan error yang lebih baik
 try:
+    from src.core_logic.data_handler import read_excel, write_excel
     from tools.validate_excel import validate_excel_columns
 except ImportError:
     print("FATAL ERROR: Tidak dapat mengimpor validate_excel. Pastikan Anda menjalankan skrip ini sebagai modul dari direktori root proyek.")
@@ -44,7 +45,7 @@ def fix_excel_structure(file_path: str, make_backup=True, remove_extra=False, ve
     
     try:
         if file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path)
+            df = read_excel(file_path)
         elif file_path.endswith('.csv'):
             df = pd.read_csv(file_path)
         else:
@@ -101,7 +102,7 @@ def fix_excel_structure(file_path: str, make_backup=True, remove_extra=False, ve
     
     try:
         if file_path.endswith('.xlsx'):
-            df.to_excel(file_path, index=False)
+            write_excel(df, file_path)
         elif file_path.endswith('.csv'):
             df.to_csv(file_path, index=False)
         logging.info(f"Berhasil menyimpan perubahan ke {file_path}")
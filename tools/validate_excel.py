@@ -6,6 +6,13 @@ from typing import Dict, Any
 
 import pandas as pd
 
+# Pembaca Excel tercepat dari data_handler jika tersedia. Alat ini juga bisa dijalankan langsung
+# (python tools/validate_excel.py) di mana paket src tidak bisa diimpor; pakai pandas biasa.
+try:
+    from src.core_logic.data_handler import read_excel
+except ImportError:
+    read_excel = pd.read_excel
+
 # Konfigurasi logging dasar untuk alat bantu CLI.
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
@@ -33,7 +40,7 @@ def validate_excel_columns(file_path: str) -> Dict[str, Any]:
         
     try:
         if file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path)
+            df = read_excel(file_path)
         elif file_path.endswith('.csv'):
             df = pd.read_csv(file_path)
         else: